@@ -166,10 +166,19 @@ Module contents
 ===============
 """
 
+import os
+import stat
 import errno
+import mmap as mmap_
+import marshal
+import tempfile
+import threading
 import re as re_
 import collections
+import itertools
 import io
+import hashlib
+import locale
 
 
 class Section(object):
@@ -178,11 +187,21 @@ class Section(object):
     section. You should never need to instantiate this class directly, use
     :py:class:`ConfigFile` instead.
     """
-    # TODO: Compile only once (bug #20)
     _PARSE_SECTION = r'^\s*\[(.+)\]\s*$'
     _PARSE_OPTION = r'^\s*([^\=]+?)\s*\=\s*(.*?)\s*$'
     _PARSE_COMMENT = r'^\s*[#;]{1}\s*(.*?)\s*$'
     _PARSE_IGNORE = r'^\s*$'
+    # The four patterns above combined in a single one that classifies a line
+    #  with one match; the alternatives are listed in the same order as the
+    #  patterns were tested by the original parser, which matters, since for
+    #  example "[a=b]" is an option, not a section
+    _PARSE_LINE = (r'^\s*(?:(?P<ignore>)|[#;]{1}\s*(?P<comment>.*?)|'
+                   r'(?P<key>[^\=]+?)\s*\=\s*(?P<value>.*?)|'
+                   r'\[(?P<section>.+)\])\s*$')
+    # Lines starting with one of these characters can be classified without
+    #  running the combined pattern
+    _PARSE_COMMENT_CHARS = ('#', ';')
+    _PARSE_IGNORE_CHARS = ('\n', )
 
     _SECTION_SUB = r'^[a-zA-Z_]+(?:\.?[a-zA-Z0-9_]+)*$'
     _SECTION_PLAIN = r'^[a-zA-Z_]+[a-zA-Z0-9_]*$'
@@ -204,6 +223,7 @@ class Section(object):
     _INTERPOLATION_SPLIT = (r'(' + r'|'.join(re_.escape(mark) for mark in (
                             _INTERPOLATION_SPECIAL_ESC, _INTERPOLATION_START,
                             _INTERPOLATION_SEP, _INTERPOLATION_END)) + r')')
+    _INTERPOLATION_SPLIT_RE = re_.compile(_INTERPOLATION_SPLIT)
 
     _GET_BOOLEAN_TRUE = ('true', '1', 'yes', 'on', 'enabled')
     _GET_BOOLEAN_FALSE = ('false', '0', 'no', 'off', 'disabled')
@@ -213,9 +233,30 @@ class Section(object):
 
     # Use lambda to create a new object every time
     _EMPTY_SECTION = lambda self: (self._DICT_CLASS(), self._DICT_CLASS())
+    # Stored in the disk cache files, change it whenever their format changes
+    _DISK_CACHE_FORMAT = 'configfile-2'
+
+    # The root section of a ConfigFile object overrides these with a
+    #  _PathCache, a _LiveInterpolator and a ParseCache instance, and with the
+    #  location of the disk cache (True or a directory) respectively, if
+    #  enabled
+    _path_cache = None
+    _live_interpolation = None
+    _parse_cache = None
+    _disk_cache = None
+    # ConfigFile objects also override the encoding of the source files
+    _encoding = None
+    # The _LazyIndex of a ConfigFile object loaded lazily
+    _lazy = None
+
+    __slots__ = ('_NAME', '_PARENT', '_ROOT', '_SETTINGS', '_options',
+                 '_options_index', '_shared', '_subsections',
+                 '_subsections_index', '_inherited', '_values',
+                 '_fingerprint', '__weakref__')
 
     def __init__(self, name=None, parent=None, safe_calls=False,
-                 inherit_options=False, subsections=True, ignore_case=True):
+                 inherit_options=False, subsections=True, ignore_case=True,
+                 settings=None):
         """
         Constructor.
 
@@ -230,21 +271,40 @@ class Section(object):
         :param bool ignore_case: If True, section and option names will be
             compared ignoring case differences; regular expressions will use
             ``re.I`` flag.
+        :param _Settings settings: The settings object shared with the other
+            sections of the tree; if set, the previous parameters are ignored.
         """
         self._NAME = name
         self._PARENT = parent
-        # TODO: Move constant settings to a Settings class (bug #19)
-        self._SAFE_CALLS = safe_calls
-        self._INHERIT_OPTIONS = inherit_options
-        self._ENABLE_SUBSECTIONS = subsections
-        self._IGNORE_CASE = ignore_case
-        self._RE_I = re_.I if self._IGNORE_CASE else 0
+        self._ROOT = self if parent is None else parent._ROOT
 
-        self._SECTION = self._SECTION_SUB if self._ENABLE_SUBSECTIONS else \
-                        self._SECTION_PLAIN
+        # All the sections of a tree share the same settings object (bug #19)
+        if settings is None:
+            settings = _Settings.create(safe_calls, inherit_options,
+                                        subsections, ignore_case)
+
+        self._SETTINGS = settings
 
         self._options = self._DICT_CLASS()
+        # If ignoring case, map the lowercase option names to the names under
+        #  which the options are stored in _options
+        self._options_index = {} if settings.ignore_case else None
+        # True if _options and _options_index are shared with a clone
+        self._shared = False
         self._subsections = self._DICT_CLASS()
+        # If ignoring case, map the lowercase subsection names to the names
+        #  under which the subsections are stored in _subsections
+        self._subsections_index = {} if settings.ignore_case else None
+        # The _InheritedOptions view, built when options are first read with
+        #  inheritance
+        self._inherited = None
+        # Map the (lowercased if ignoring case) option names to dictionaries
+        #  of their values converted by get_int, get_float and get_bool,
+        #  created at the first conversion
+        self._values = None
+        # The content hash returned by fingerprint(), or None if it must be
+        #  computed again
+        self._fingerprint = None
 
     ### DATA MODEL ###
 
@@ -266,32 +326,68 @@ class Section(object):
         # current
         safe = kwargs.get('safe')
 
+        cache = self._ROOT._path_cache
+
+        # Resolving a single name is as fast as looking it up in the cache
+        if cache is not None and len(path) > 1:
+            key = (self, self._normalize_path(path))
+            section = cache.get(key)
+
+            if section is None:
+                try:
+                    section = self._resolve_path(path, False)
+                except KeyError:
+                    # Do not cache the ancestors returned for non-existent
+                    #  paths with safe calls
+                    return self._resolve_path(path, safe)
+
+                cache.set(key, section)
+
+            return section
+
+        return self._resolve_path(path, safe)
+
+    def _resolve_path(self, path, safe):
+        """
+        Auxiliary method for :py:meth:`__call__`.
+
+        Walk the given path of section names starting from the current
+        section.
+        """
         section = self
 
         for sname in path:
-            try:
-                lsname = sname.lower()
-            except AttributeError:
+            if not isinstance(sname, str):
                 raise TypeError('Section name must be a string: {}'.format(
                                                                         sname))
 
-            if self._IGNORE_CASE:
-                for subname in section._subsections:
-                    if lsname == subname.lower():
-                        section = section._subsections[subname]
-                        break
-                else:
-                    self._finalize_call(safe, sname)
-                    break
-            else:
-                try:
-                    section = section._subsections[sname]
-                except KeyError:
-                    self._finalize_call(safe, sname)
-                    break
+            subsection = section._find_subsection(sname)
+
+            if subsection is None:
+                self._finalize_call(safe, sname)
+                break
+
+            section = subsection
 
         return section
 
+    def _normalize_path(self, path):
+        """
+        Auxiliary method for :py:meth:`__call__`.
+
+        Return the path of section names as a tuple, lowercased if ignoring
+        case.
+        """
+        for sname in path:
+            if not isinstance(sname, str):
+                raise TypeError('Section name must be a string: {}'.format(
+                                                                        sname))
+
+        if self._SETTINGS.ignore_case:
+            return tuple(sname.lower() for sname in path)
+
+        return tuple(path)
+
     def _finalize_call(self, safe, sname):
         """
         Auxiliary method for :py:meth:`__call__`.
@@ -299,7 +395,7 @@ class Section(object):
         Process a not-found section name.
         """
         if safe not in (True, False):
-            if self._SAFE_CALLS:
+            if self._SETTINGS.safe_calls:
                 return
         elif safe:
             return
@@ -312,7 +408,7 @@ class Section(object):
         :param str opt: The name of the option whose value must be returned.
         """
         item = self.get(opt, fallback=None,
-                                         inherit_options=self._INHERIT_OPTIONS)
+                        inherit_options=self._SETTINGS.inherit_options)
         # self.get returns None as a fallback value if opt is not found:
         # however, for compatibility with usual dictionary operations,
         # __getitem__ should better raise KeyError in this case
@@ -330,15 +426,7 @@ class Section(object):
         """
         if isinstance(opt, str):
             if isinstance(val, str):
-                if self._IGNORE_CASE:
-                    for o in self._options:
-                        if opt.lower() == o.lower():
-                            self._options[o] = val
-                            break
-                    else:
-                        self._options[opt] = val
-                else:
-                    self._options[opt] = val
+                self._store_option(opt, val)
             else:
                 raise TypeError('Value must be a string: {}'.format(val))
         else:
@@ -350,23 +438,15 @@ class Section(object):
 
         :param str opt: The name of the option that must be deleted.
         """
-        try:
-            lopt = opt.lower()
-        except AttributeError:
+        if not isinstance(opt, str):
             raise TypeError('Option name must be a string: {}'.format(opt))
-        else:
-            if self._IGNORE_CASE:
-                for o in self._options:
-                    if opt.lower() == o.lower():
-                        del self._options[o]
-                        break
-                else:
-                    raise KeyError('Option not found: {}'.format(opt))
-            else:
-                try:
-                    del self._options[opt]
-                except KeyError:
-                    raise KeyError('Option not found: {}'.format(opt))
+
+        o = self._find_option(opt)
+
+        if o is None:
+            raise KeyError('Option not found: {}'.format(opt))
+
+        self._remove_option(o)
 
     def __iter__(self):
         """
@@ -385,15 +465,195 @@ class Section(object):
         :type item: Section or str
         """
         if isinstance(item, Section):
-            return item in self._subsections.values()
-        elif self._IGNORE_CASE:
-            for o in self._options:
-                if item.lower() == o.lower():
-                    return True
-            else:
-                return False
+            # Deleted sections keep the reference to their former parent, so
+            #  this also checks that the section is still stored here
+            return item._PARENT is self and \
+                            self._subsections.get(item._NAME) is item
         else:
-            return item in self._options
+            return self._find_option(item) is not None
+
+    def _find_option(self, opt):
+        """
+        Return the name under which the option is stored in the section, or
+        None if the section does not have the option.
+
+        :param str opt: The name of the option, in any casing if the section
+            ignores case.
+        """
+        if self._SETTINGS.ignore_case:
+            return self._options_index.get(opt.lower())
+        elif opt in self._options:
+            return opt
+        else:
+            return None
+
+    def _store_option(self, opt, val):
+        """
+        Store a value in an option, creating the option if it does not exist.
+
+        Return the name under which the option is stored.
+
+        :param str opt: The name of the option.
+        :param str val: The new value for the option.
+        """
+        if self._shared:
+            self._own_options()
+
+        o = self._find_option(opt)
+
+        if o is None:
+            o = opt
+
+            if self._SETTINGS.ignore_case:
+                self._options_index[opt.lower()] = opt
+
+        self._options[o] = val
+        self._option_changed(o)
+        return o
+
+    def _remove_option(self, opt):
+        """
+        Delete an option.
+
+        :param str opt: The name under which the option is stored.
+        """
+        if self._shared:
+            self._own_options()
+
+        del self._options[opt]
+
+        if self._SETTINGS.ignore_case:
+            del self._options_index[opt.lower()]
+
+        self._option_changed(opt)
+
+    def _own_options(self):
+        """
+        Copy the options of the section, which are shared with a clone (see
+        :py:meth:`clone`), so that they can be modified.
+        """
+        self._options = self._DICT_CLASS(self._options)
+
+        if self._SETTINGS.ignore_case:
+            self._options_index = dict(self._options_index)
+
+        self._shared = False
+
+    def _option_changed(self, opt):
+        """
+        Discard the data derived from the options of the section; this must be
+        called whenever an option is created, changed or deleted.
+
+        :param opt: The name under which the option is stored, or None if all
+            the options may have changed.
+        """
+        if self._values is not None:
+            if opt is None:
+                self._values = None
+            else:
+                self._values.pop(opt.lower() if self._SETTINGS.ignore_case
+                                 else opt, None)
+
+        self._invalidate_inherited()
+        self._invalidate_fingerprint()
+
+        live = self._ROOT._live_interpolation
+
+        if live is not None:
+            if opt is None:
+                live.clear()
+            else:
+                live.option_changed(self, opt)
+
+    def _invalidate_inherited(self):
+        """
+        Discard the inherited-option views of the section and of all its
+        descendants.
+        """
+        # A view is always built after the views of all the ancestors, so if a
+        #  section does not have a view, neither do its descendants
+        stack = [self]
+
+        while stack:
+            section = stack.pop()
+
+            if section._inherited is not None:
+                section._inherited = None
+                stack.extend(section._subsections.values())
+
+    def _invalidate_fingerprint(self):
+        """
+        Discard the fingerprints of the section and of all its ancestors.
+        """
+        # A fingerprint is always computed after the fingerprints of all the
+        #  descendants, so if a section does not have one, neither do its
+        #  ancestors
+        section = self
+
+        while section is not None and section._fingerprint is not None:
+            section._fingerprint = None
+            section = section._PARENT
+
+    def _find_subsection(self, sec):
+        """
+        Return the child section with the given name, or None if it does not
+        exist.
+
+        :param str sec: The name of the subsection, in any casing if the
+            section ignores case.
+        """
+        if self._SETTINGS.ignore_case:
+            ss = self._subsections_index.get(sec.lower())
+
+            if ss is None:
+                return None
+
+            return self._subsections[ss]
+
+        return self._subsections.get(sec)
+
+    def _remove_subsection(self, sec):
+        """
+        Delete a child section.
+
+        :param str sec: The name under which the subsection is stored.
+        """
+        subsection = self._subsections.pop(sec)
+
+        if self._SETTINGS.ignore_case:
+            del self._subsections_index[sec.lower()]
+
+        # The subsection is detached from the tree, so it cannot inherit from
+        #  its former ancestors anymore
+        subsection._invalidate_inherited()
+        self._structure_changed()
+
+    def _structure_changed(self):
+        """
+        Invalidate the fingerprints of the section and its ancestors, and the
+        resolved paths and the live interpolations cached by the root section,
+        if any; this must be called whenever a subsection is added or removed.
+        """
+        self._invalidate_fingerprint()
+        root = self._ROOT
+
+        if root._path_cache is not None:
+            root._path_cache.invalidate()
+
+        if root._live_interpolation is not None:
+            root._live_interpolation.clear()
+
+    def _clear(self):
+        """
+        Delete all the options and subsections of the section.
+        """
+        self._option_changed(None)
+        self._options = self._DICT_CLASS()
+        self._options_index = {} if self._SETTINGS.ignore_case else None
+        self._shared = False
+        self._subsections = self._DICT_CLASS()
+        self._subsections_index = {} if self._SETTINGS.ignore_case else None
+        self._structure_changed()
 
     ### IMPORTING DATA ###
 
@@ -420,7 +680,7 @@ class Section(object):
         """
         Delete the current section.
         """
-        del self._PARENT._subsections[self._NAME]
+        self._PARENT._remove_subsection(self._NAME)
 
     def upgrade(self, *sources, **kwargs):
         """
@@ -437,13 +697,17 @@ class Section(object):
         :param sources: A sequence of files, file-like objects, dictionaries
             and/or special objects.
         :param bool interpolation: Enable/disable value interpolation.
+        :param bool defer_interpolation: If True, interpolate values only once
+            after importing all the sources; see :py:meth:`_import`.
         """
         # Necessary for Python 2 compatibility
         # The Python 3 definition was:
         #def upgrade(self, *sources, interpolation=False):
         interpolation = kwargs.get('interpolation', False)
+        defer_interpolation = kwargs.get('defer_interpolation', False)
 
-        self._import(sources, interpolation=interpolation)
+        self._import(sources, interpolation=interpolation,
+                     defer_interpolation=defer_interpolation)
 
     def update(self, *sources, **kwargs):
         """
@@ -460,13 +724,17 @@ class Section(object):
         :param sources: A sequence of files, file-like objects, dictionaries
             and/or special objects.
         :param bool interpolation: Enable/disable value interpolation.
+        :param bool defer_interpolation: If True, interpolate values only once
+            after importing all the sources; see :py:meth:`_import`.
         """
         # Necessary for Python 2 compatibility
         # The Python 3 definition was:
         #def upgrade(self, *sources, interpolation=False):
         interpolation = kwargs.get('interpolation', False)
+        defer_interpolation = kwargs.get('defer_interpolation', False)
 
-        self._import(sources, add=False, interpolation=interpolation)
+        self._import(sources, add=False, interpolation=interpolation,
+                     defer_interpolation=defer_interpolation)
 
     def reset(self, *sources, **kwargs):
         """
@@ -478,18 +746,27 @@ class Section(object):
 
         *{A:a,B:b,C:c} reset {A:d,D:e} => {A:d,D:e}*
 
+        The data are only deleted after a file source has been read entirely,
+        so they are left intact if it contains an invalid line; this requires
+        keeping the parsed contents of the whole file in memory (see
+        :py:meth:`_import_file`).
+
         See :py:meth:`_import_object` for object compatibility.
 
         :param sources: A sequence of files, file-like objects, dictionaries
             and/or special objects.
         :param bool interpolation: Enable/disable value interpolation.
+        :param bool defer_interpolation: If True, interpolate values only once
+            after importing all the sources; see :py:meth:`_import`.
         """
         # Necessary for Python 2 compatibility
         # The Python 3 definition was:
         #def upgrade(self, *sources, interpolation=False):
         interpolation = kwargs.get('interpolation', False)
+        defer_interpolation = kwargs.get('defer_interpolation', False)
 
-        self._import(sources, reset=True, interpolation=interpolation)
+        self._import(sources, reset=True, interpolation=interpolation,
+                     defer_interpolation=defer_interpolation)
 
     def add(self, *sources, **kwargs):
         """
@@ -506,16 +783,20 @@ class Section(object):
         :param sources: A sequence of files, file-like objects, dictionaries
             and/or special objects.
         :param bool interpolation: Enable/disable value interpolation.
+        :param bool defer_interpolation: If True, interpolate values only once
+            after importing all the sources; see :py:meth:`_import`.
         """
         # Necessary for Python 2 compatibility
         # The Python 3 definition was:
         #def upgrade(self, *sources, interpolation=False):
         interpolation = kwargs.get('interpolation', False)
+        defer_interpolation = kwargs.get('defer_interpolation', False)
 
-        self._import(sources, overwrite=False, interpolation=interpolation)
+        self._import(sources, overwrite=False, interpolation=interpolation,
+                     defer_interpolation=defer_interpolation)
 
     def _import(self, sources, overwrite=True, add=True, reset=False,
-                                                        interpolation=False):
+                            interpolation=False, defer_interpolation=False):
         """
         Parse some files, file-like objects, dictionaries or special objects
         and add their configuration to the existing one.
@@ -539,32 +820,64 @@ class Section(object):
             ``${section$:section$:option$}``. Options will be interpolated only
             once at importing: all links among options will be lost after
             importing.
+        :param bool defer_interpolation: If False, the values are interpolated
+            after importing each source, so references are resolved with the
+            values merged so far and the values interpolated by a source are
+            interpolated again by the following ones; if True, all the sources
+            are merged first and the values are interpolated only once, so
+            references are resolved with the final values. The results are the
+            same unless a later source overrides a referenced option, or
+            values contain escaped ``$$`` sequences.
         """
+        if self._ROOT._live_interpolation is not None:
+            # Values are interpolated when they are read
+            interpolation = False
+
         for source in sources:
             if source is None:
                 continue
             elif isinstance(source, str):
-                obj = self._parse_file(self._open_file(source))
+                if self._ROOT._parse_cache is not None or \
+                                        self._ROOT._disk_cache is not None:
+                    self._import_tokens(self._tokenize_cached_file(source),
+                                        overwrite=overwrite, add=add,
+                                        reset=reset)
+                else:
+                    self._import_file(self._open_file(source),
+                                      overwrite=overwrite, add=add,
+                                      reset=reset)
             elif isinstance(source, io.IOBase):
-                obj = self._parse_file(source)
-            elif isinstance(source, dict):
-                obj = (source, {})
+                self._import_file(source, overwrite=overwrite, add=add,
+                                  reset=reset)
             else:
-                obj = source
+                if isinstance(source, dict):
+                    obj = (source, {})
+                else:
+                    obj = source
 
-            self._import_object(obj, overwrite=overwrite, add=add, reset=reset)
+                self._import_object(obj, overwrite=overwrite, add=add,
+                                    reset=reset)
 
-            if interpolation:
+            if interpolation and not defer_interpolation:
                 self._interpolate()
 
-    def _open_file(self, cfile):
+        if interpolation and defer_interpolation:
+            self._interpolate()
+
+    def _open_file(self, cfile, binary=False):
         """
         Open config file for reading.
 
         :param str cfile: The name of the file to be parsed.
+        :param bool binary: If True, open the file in binary mode; otherwise
+            open it in text mode with the encoding of the root section, if
+            set, or the platform's default encoding.
         """
         try:
-            return open(cfile, 'r')
+            if binary:
+                return io.open(cfile, 'rb')
+
+            return self._open_text_file(cfile, 'r')
         except EnvironmentError as e:
             if e.errno == errno.ENOENT:
                 raise NonExistentFileError('Cannot find {} ({})'.format(
@@ -573,6 +886,224 @@ class Section(object):
                 raise InvalidFileError('Cannot import configuration from {} '
                                         '({})'.format(e.filename, e.strerror))
 
+    def _open_text_file(self, cfile, mode):
+        """
+        Open a file in text mode with the encoding of the root section, if
+        set, or the platform's default encoding.
+
+        :param cfile: The name or the descriptor of the file.
+        :param str mode: The mode.
+        """
+        encoding = self._ROOT._encoding
+
+        if encoding is not None:
+            return io.open(cfile, mode, encoding=encoding)
+
+        # In Python 2 io.open would always use unicode strings, and open does
+        #  not accept descriptors
+        if isinstance(cfile, int):
+            return os.fdopen(cfile, mode)
+
+        return open(cfile, mode)
+
+    def _get_file_encoding(self):
+        """
+        Return the encoding used by :py:meth:`_open_text_file`, or None in
+        Python 2 if the root section has no encoding, since then the files are
+        read and written as bytes.
+        """
+        encoding = self._ROOT._encoding
+
+        if encoding is None and str is not bytes:
+            return locale.getpreferredencoding(False)
+
+        return encoding
+
+    def _tokenize_cached_file(self, cfile):
+        """
+        Return a tuple of the tokens generated by :py:meth:`_tokenize` for a
+        file, looking them up in the parse cache and then in the disk cache of
+        the root section first, if enabled.
+
+        :param str cfile: The name of the file to be parsed.
+        """
+        cache = self._ROOT._parse_cache
+        stream = self._open_file(cfile)
+
+        # Stat the open file, so that the key describes the data that is read
+        try:
+            st = os.fstat(stream.fileno())
+        except BaseException:
+            stream.close()
+            raise
+
+        mtime = getattr(st, 'st_mtime_ns', st.st_mtime)
+
+        if cache is not None:
+            key = (os.path.realpath(cfile), st.st_dev, st.st_ino, st.st_size,
+                   mtime, self._ROOT._encoding)
+            tokens = cache.get(key)
+
+            if tokens is not None:
+                stream.close()
+                return tokens
+
+        if self._ROOT._disk_cache is not None:
+            tokens = self._tokenize_disk_cached_file(cfile, stream, st, mtime)
+        else:
+            with stream:
+                tokens = tuple(self._tokenize(stream))
+
+        if cache is not None:
+            cache.set(key, tokens, st.st_size)
+
+        return tokens
+
+    def _tokenize_disk_cached_file(self, cfile, stream, st, mtime):
+        """
+        Auxiliary method for :py:meth:`_tokenize_cached_file`.
+
+        Return the tokens of a file, loading them from its entry in the disk
+        cache directory if this is still valid, i.e. if the path, the device,
+        the inode, the size, the modification time and the encoding of the
+        file are the ones stored in it; otherwise tokenize the file and write
+        the entry, if possible.
+
+        Entries are only loaded if they are owned by the current user and not
+        writable by the group or by others, since they could otherwise have
+        been planted by another user to inject arbitrary options (the check
+        is skipped on platforms without user IDs).
+
+        :param str cfile: The name of the file.
+        :param stream: The file opened for reading.
+        :param st: The result of ``os.fstat`` on the open file.
+        :param mtime: The modification time of the file.
+        """
+        path = os.path.realpath(cfile)
+        header = (self._DISK_CACHE_FORMAT, path, st.st_dev, st.st_ino,
+                  st.st_size, mtime, stream.encoding)
+        location = self._ROOT._disk_cache
+        cache_file = os.path.join(location, '{}.configfile-cache'.format(
+                                  hashlib.sha1(path.encode('utf-8')
+                                               ).hexdigest()))
+
+        try:
+            with open(cache_file, 'rb') as cache_stream:
+                # Check the open entry, so that it cannot be replaced
+                #  between the check and the read
+                if self._is_trusted_cache_file(cache_stream):
+                    # marshal.load would read the file in many small chunks
+                    cached = marshal.loads(cache_stream.read())
+                else:
+                    cached = None
+        except (EnvironmentError, EOFError, ValueError, TypeError):
+            # Missing, unreadable, corrupted or written by an incompatible
+            #  version of Python
+            cached = None
+
+        if isinstance(cached, tuple) and len(cached) == 2 and \
+                                                        cached[0] == header:
+            stream.close()
+            return cached[1]
+
+        with stream:
+            tokens = tuple(self._tokenize(stream))
+
+        try:
+            # Entries in a directory accessible to other users would leak the
+            #  configuration; an existing directory is used as it is
+            os.makedirs(location, 0o700)
+        except OSError:
+            pass
+
+        try:
+            fd, temp = tempfile.mkstemp(prefix='.', suffix='.tmp',
+                                        dir=location)
+        except EnvironmentError:
+            # The cache is an optimization, do not fail if it cannot be written
+            return tokens
+
+        try:
+            with os.fdopen(fd, 'wb') as cache_stream:
+                marshal.dump((header, tokens), cache_stream)
+
+            _replace_file(temp, cache_file)
+        except EnvironmentError:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+
+        return tokens
+
+    @staticmethod
+    def _is_trusted_cache_file(stream):
+        """
+        Auxiliary method for :py:meth:`_tokenize_disk_cached_file`.
+
+        Return True if an open disk cache entry is owned by the current user
+        and is not writable by the group or by others.
+        """
+        st = os.fstat(stream.fileno())
+
+        if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            return False
+
+        # os.getuid is not available on Windows
+        getuid = getattr(os, 'getuid', None)
+        return getuid is None or st.st_uid == getuid()
+
+    def _tokenize(self, stream, comments=False, lno=0):
+        """
+        Classify the lines of a text file, yielding a token for each
+        significant line.
+
+        Each token is a 4-tuple, ``(lno, section, key, value)``, where ``lno``
+        is the 0-based line number; for section lines ``section`` is the
+        full section name and ``key`` and ``value`` are None; for option lines
+        ``section`` is None; for comment lines (only yielded if ``comments``
+        is True) ``section`` and ``key`` are None and ``value`` is the text of
+        the comment.
+
+        Every line is matched at most once against :py:attr:`_PARSE_LINE`,
+        and comment and blank lines are recognized from their first character
+        where possible.
+
+        :param stream: a file-like object to be read from.
+        :param bool comments: whether comment lines are yielded too.
+        :param int lno: The 0-based line number of the first line.
+        """
+        # _PARSE_LINE does not contain cased characters, so it does not need
+        #  the re.I flag, which would only slow the matching down
+        match = re_.compile(self._PARSE_LINE).match
+        comment_chars = self._PARSE_COMMENT_CHARS
+        ignore_chars = self._PARSE_IGNORE_CHARS
+
+        for lno, line in enumerate(stream, lno):
+            first = line[:1]
+
+            if first in ignore_chars:
+                continue
+
+            if first in comment_chars and not comments:
+                continue
+
+            re_line = match(line)
+
+            if re_line is None:
+                raise ParsingError('Invalid line in {}: {} (line {})'.format(
+                                    getattr(stream, 'name', stream), line,
+                                    lno + 1))
+
+            kind = re_line.lastgroup
+
+            if kind == 'value':
+                yield (lno, None, re_line.group('key'), re_line.group('value'))
+            elif kind == 'section':
+                yield (lno, re_line.group('section'), None, None)
+            elif kind == 'comment' and comments:
+                yield (lno, None, None, re_line.group('comment'))
+
     def _parse_file(self, stream):
         """
         Parse a text file and translate it into a compatible object, thus
@@ -584,55 +1115,147 @@ class Section(object):
             cdict = self._EMPTY_SECTION()
             lastsect = cdict
 
-            for lno, line in enumerate(stream):
-                # Note that the order the various types are evaluated
-                # matters!
-                # TODO: Really? What about sorting the tests according
-                #       to their likelihood to pass?
-
-                if re_.match(self._PARSE_IGNORE, line, self._RE_I):
+            for lno, section, key, value in self._tokenize(stream):
+                if section is None:
+                    lastsect[0][key] = value
                     continue
 
-                if re_.match(self._PARSE_COMMENT, line, self._RE_I):
-                    continue
+                d = cdict
 
-                re_option = re_.match(self._PARSE_OPTION, line, self._RE_I)
+                for s in self._parse_subsections(section):
+                    if s not in d[1]:
+                        d[1][s] = self._EMPTY_SECTION()
 
-                if re_option:
-                    lastsect[0][re_option.group(1)] = re_option.group(2)
-                    continue
+                    d = d[1][s]
+
+                lastsect = d
+
+        return cdict
+
+    def _parse_subsections(self, name):
+        """
+        Parse the sections hierarchy in a section line of a text file and
+        return them in a list.
+
+        :param str name: the full name of the section.
+        """
+        if self._SETTINGS.subsections:
+            return name.split(self._SECTION_SEP)
+        else:
+            return (name, )
+
+    def _import_file(self, stream, overwrite=True, add=True, reset=False):
+        """
+        Parse a text file and import its sections and options directly into
+        the current section.
+
+        This has the same effect as importing the object returned by
+        :py:meth:`_parse_file` with :py:meth:`_import_object`, but the
+        options and subsections are stored while the file is read, without
+        building and then traversing an intermediate object. Note that if the
+        file contains an invalid line, in update mode the data that precede
+        it will have already been imported when :py:exc:`ParsingError` is
+        raised; in reset mode the whole file is tokenized before the
+        pre-existing data are cleared, so they are left intact, but the
+        tokens of the whole file are kept in memory at the same time, so in
+        this mode the peak memory is not lower than with
+        :py:meth:`_parse_file`.
 
-                re_section = re_.match(self._PARSE_SECTION, line,
-                                                                self._RE_I)
-                if re_section:
-                    subs = self._parse_subsections(re_section)
-                    d = cdict
+        :param stream: a file-like object to be read from.
+        :param bool overwrite: Whether imported data will overwrite
+            pre-existing data.
+        :param bool add: Whether non-pre-existing data will be imported.
+        :param bool reset: Whether pre-existing data will be cleared.
+        """
+        with stream:
+            self._import_tokens(self._tokenize(stream), overwrite=overwrite,
+                                add=add, reset=reset)
 
-                    for s in subs:
-                        if s not in d[1]:
-                            d[1][s] = self._EMPTY_SECTION()
+    def _import_tokens(self, tokens, overwrite=True, add=True, reset=False):
+        """
+        Auxiliary method for :py:meth:`_import_file`.
 
-                        d = d[1][s]
+        Import the sections and options of a sequence of tokens, as generated
+        by :py:meth:`_tokenize`, directly into the current section.
+        """
+        if reset:
+            # Read all the tokens first, so that an invalid line does not
+            #  leave the section cleared and only partially imported
+            tokens = list(tokens)
+            self._clear()
+
+        settings = self._SETTINGS
+        match_option = re_.compile(self._OPTION, settings.re_i).match
+        match_section = re_.compile(settings.section, settings.re_i).match
+
+        # For each section, map the exact names of the options already read
+        #  from the file to the names under which they were stored (or None if
+        #  they were not imported): as in _parse_file, if an option is
+        #  repeated, the last value must prevail, but whether and where it is
+        #  stored must be decided only once
+        imported = {self: {}}
+        section = self
+        section_imported = imported[self]
+        section_reset = reset
 
-                    lastsect = d
+        for lno, sname, key, value in tokens:
+            if sname is None:
+                if section is None:
+                    # The section is not imported in update mode
                     continue
 
-                raise ParsingError('Invalid line in {}: {} (line {})'
-                                        ''.format(cfile, line, lno + 1))
+                # Values are always valid, since _PARSE_LINE never
+                #  matches newline characters
+                if not match_option(key):
+                    raise InvalidObjectError('Invalid option or value: '
+                                             '{}: {}'.format(key, value))
 
-        return cdict
+                try:
+                    okey = section_imported[key]
+                except KeyError:
+                    section_imported[key] = \
+                                section._import_object_option(overwrite,
+                                add or section_reset, section_reset, key,
+                                value)
+                else:
+                    if okey is not None:
+                        section._store_option(okey, value)
+
+                continue
+
+            section = self
+            section_reset = False
+
+            for name in self._parse_subsections(sname):
+                if not match_section(name):
+                    raise InvalidObjectError('Invalid section name: {}'
+                                                        ''.format(name))
+
+                section = section._import_file_subsection(name,
+                                add or (reset and section is self))
 
-    def _parse_subsections(self, re):
+                if section is None:
+                    break
+            else:
+                section_imported = imported.setdefault(section, {})
+
+    def _import_file_subsection(self, sec, add):
         """
-        Parse the sections hierarchy in a section line of a text file and
-        return them in a list.
+        Auxiliary method for :py:meth:`_import_file`.
 
-        :param re: regular expression object.
+        Return the subsection with the given name, creating it if it does not
+        exist and add is True; return None if it does not exist and add is
+        False.
         """
-        if self._ENABLE_SUBSECTIONS:
-            return re.group(1).split(self._SECTION_SEP)
-        else:
-            return (re.group(1), )
+        subsection = self._find_subsection(sec)
+
+        if subsection is not None:
+            return subsection
+
+        if add:
+            return self._create_subsection(sec)
+
+        return None
 
     def _import_object(self, cobj, overwrite=True, add=True, reset=False):
         """
@@ -684,13 +1307,14 @@ class Section(object):
         # TODO: Change "reset" mode to "remove" (complementing "overwrite" and
         #       "add") (bug #25)
         if reset:
-            self._options = self._DICT_CLASS()
-            self._subsections = self._DICT_CLASS()
+            self._clear()
+
+        re_i = self._SETTINGS.re_i
 
         for o in cobj[0]:
             if isinstance(o, str) and isinstance(cobj[0][o], str) and \
-                                re_.match(self._OPTION, o, self._RE_I) and \
-                                re_.match(self._VALUE, cobj[0][o], self._RE_I):
+                                re_.match(self._OPTION, o, re_i) and \
+                                re_.match(self._VALUE, cobj[0][o], re_i):
                 self._import_object_option(overwrite, add, reset, o,
                                                                     cobj[0][o])
             else:
@@ -698,7 +1322,8 @@ class Section(object):
                                                     ''.format(o, cobj[0][o]))
 
         for s in cobj[1]:
-            if isinstance(s, str) and re_.match(self._SECTION, s, self._RE_I):
+            if isinstance(s, str) and re_.match(self._SETTINGS.section, s,
+                                                                    re_i):
                 self._import_object_subsection(overwrite, add, reset, s,
                                                                     cobj[1][s])
             else:
@@ -709,39 +1334,20 @@ class Section(object):
         Auxiliary method for :py:meth:`_import_object`.
 
         Import the currently-examined option.
-        """
-        if reset:
-            self._options[opt] = val
-            return True
-
-        if self._IGNORE_CASE:
-            for o in self._options:
-                if opt.lower() == o.lower():
-                    # Don't even think of merging these two tests
-                    if overwrite:
-                        self._options[o] = val
-                        return True
-
-                    break
 
-            else:
-                # Going through the loop above makes sure the option is not yet
-                #  in the section
-                if add:
-                    self._options[opt] = val
-                    return True
-
-        elif opt in self._options:
-            # Don't even think of merging these two tests
-            if overwrite:
-                self._options[opt] = val
-                return True
+        Return the name under which the option has been stored, or None if it
+        has not been imported.
+        """
+        o = self._find_option(opt)
 
-        elif add:
-            self._options[opt] = val
-            return True
+        if o is None:
+            if add or reset:
+                return self._store_option(opt, val)
+        # Don't even think of merging these two tests
+        elif overwrite or reset:
+            return self._store_option(o, val)
 
-        return False
+        return None
 
     def _import_object_subsection(self, overwrite, add, reset, sec, secd):
         """
@@ -749,33 +1355,17 @@ class Section(object):
 
         Import the currently-examined subsection.
         """
-        if reset:
-            self._import_object_subsection_create(overwrite, add, sec, secd)
+        # If resetting, the section has just been cleared, so any subsection
+        #  found here has been created by the same import, from a name that
+        #  differs only in case
+        subsection = self._find_subsection(sec)
+
+        if subsection is not None:
+            # Don't test overwrite here
+            subsection._import_object(secd, overwrite=overwrite, add=add)
             return True
 
-        if self._IGNORE_CASE:
-            for ss in self._subsections:
-                if sec.lower() == ss.lower():
-                    # Don't test overwrite here
-                    self._subsections[ss]._import_object(secd,
-                                                overwrite=overwrite, add=add)
-                    return True
-
-            else:
-                # Going through the loop above makes sure the section is not
-                #  yet a subsection of the visited section
-                if add:
-                    self._import_object_subsection_create(overwrite, add, sec,
-                                                                        secd)
-                    return True
-
-        elif sec in self._subsections:
-            # Don't test overwrite here
-            self._subsections[sec]._import_object(secd, overwrite=overwrite,
-                                                                    add=add)
-            return True
-
-        elif add:
+        elif add or reset:
             self._import_object_subsection_create(overwrite, add, sec, secd)
             return True
 
@@ -787,14 +1377,26 @@ class Section(object):
 
         Import the currently-examined subsection.
         """
-        subsection = Section(name=sec, parent=self,
-                             safe_calls=self._SAFE_CALLS,
-                             inherit_options=self._INHERIT_OPTIONS,
-                             subsections=self._ENABLE_SUBSECTIONS,
-                             ignore_case=self._IGNORE_CASE)
+        subsection = self._create_subsection(sec)
         subsection._import_object(secd, overwrite=overwrite, add=add)
+
+    def _create_subsection(self, sec):
+        """
+        Create an empty subsection under the current section and return it.
+
+        Any existing subsection with the same name is replaced.
+
+        :param str sec: The name of the new subsection.
+        """
+        subsection = Section(name=sec, parent=self, settings=self._SETTINGS)
         self._subsections[sec] = subsection
 
+        if self._SETTINGS.ignore_case:
+            self._subsections_index[sec.lower()] = sec
+
+        self._structure_changed()
+        return subsection
+
     def _interpolate(self):
         """
         Interpolate values among different options.
@@ -817,65 +1419,77 @@ class Section(object):
         the path starts with ``$:``, the first item will be considered as a
         section (or an option, if last in the list) relative to the current
         section.
+
+        Every value is parsed once into a template (see
+        :py:meth:`_compile_template`); references are resolved in dependency
+        order, so an option always receives the interpolated value of the
+        options it refers to, regardless of their position in the tree;
+        options outside the current section and its descendants are used as
+        they are. Circular or unresolvable references raise
+        :py:exc:`InterpolationError`.
         """
-        try:
-            root = self._get_ancestors()[-1]
-        except IndexError:
-            root = self
-
-        for optname in self._options:
-            split = re_.split(self._INTERPOLATION_SPLIT,
-                              self._options[optname])
-            value = ''
-            resolve = None
-
-            for chunk in split:
-                if resolve is None:
-                    if chunk == self._INTERPOLATION_SPECIAL_ESC:
-                        value += self._INTERPOLATION_SPECIAL
-                    elif chunk == self._INTERPOLATION_START:
-                        resolve = ['']
-                    else:
-                        value += chunk
+        _Interpolator(self).interpolate()
+
+    def _compile_template(self, value):
+        """
+        Parse an option value for interpolation and return it as a template,
+        i.e. a tuple whose items are either strings, to be used literally, or
+        references; a reference is a 3-tuple with a boolean that is True if
+        the path is relative to the section of the option, the tuple of the
+        names of the sections in the path, and the name of the option.
+
+        See :py:meth:`_interpolate` for the syntax.
+
+        :param str value: The value of the option.
+        """
+        template = []
+        literal = []
+        resolve = None
+
+        for chunk in self._INTERPOLATION_SPLIT_RE.split(value):
+            if resolve is None:
+                if chunk == self._INTERPOLATION_SPECIAL_ESC:
+                    literal.append(self._INTERPOLATION_SPECIAL)
+                elif chunk == self._INTERPOLATION_START:
+                    resolve = ['']
                 else:
-                    if chunk == self._INTERPOLATION_SPECIAL_ESC:
-                        resolve[-1] += self._INTERPOLATION_SPECIAL
-                    elif chunk == self._INTERPOLATION_SEP:
-                        resolve.append('')
-                    elif chunk == self._INTERPOLATION_END:
-                        intoptname = resolve.pop()
-
-                        if len(resolve) == 0:
-                            # TODO: It's currently not possible to write a
-                            #       reference to a root option?!?
-                            intsection = self
-                        else:
-                            if resolve[0] == '':
-                                intsection = self
-                                resolve.pop(0)
-                            else:
-                                intsection = root
-                            for s in resolve:
-                                intsection = intsection._subsections[s]
-
-                        # Use get(intoptname) instead of _options[intoptname]
-                        # so that options are properly inherited if the object
-                        # is configured to do so
-                        value += intsection.get(intoptname)
-                        resolve = None
+                    literal.append(chunk)
+            else:
+                if chunk == self._INTERPOLATION_SPECIAL_ESC:
+                    resolve[-1] += self._INTERPOLATION_SPECIAL
+                elif chunk == self._INTERPOLATION_SEP:
+                    resolve.append('')
+                elif chunk == self._INTERPOLATION_END:
+                    intoptname = resolve.pop()
+
+                    # TODO: It's currently not possible to write a reference
+                    #       to a root option?!?
+                    if len(resolve) == 0:
+                        reference = (True, (), intoptname)
+                    elif resolve[0] == '':
+                        reference = (True, tuple(resolve[1:]), intoptname)
                     else:
-                        resolve[-1] += chunk
+                        reference = (False, tuple(resolve), intoptname)
+
+                    if literal:
+                        template.append(''.join(literal))
+                        literal = []
 
-            if resolve is not None:
-                # The last interpolation wasn't closed, so interpret it as a
-                # normal string
-                value += self._INTERPOLATION_START + \
-                         self._INTERPOLATION_SEP.join(resolve)
+                    template.append(reference)
+                    resolve = None
+                else:
+                    resolve[-1] += chunk
+
+        if resolve is not None:
+            # The last interpolation wasn't closed, so interpret it as a
+            # normal string
+            literal.append(self._INTERPOLATION_START +
+                           self._INTERPOLATION_SEP.join(resolve))
 
-            self._options[optname] = value
+        if literal:
+            template.append(''.join(literal))
 
-        for secname in self._subsections:
-            self._subsections[secname]._interpolate()
+        return tuple(template)
 
     ### EXPORTING DATA ###
 
@@ -894,19 +1508,26 @@ class Section(object):
             overwrites it only for this call.
         """
         if inherit_options not in (True, False):
-            inherit_options = self._INHERIT_OPTIONS
+            inherit_options = self._SETTINGS.inherit_options
 
         if isinstance(opt, str):
-            slist = [self, ]
+            live = self._ROOT._live_interpolation
+
+            if live is not None:
+                return live.get(self, opt, fallback, inherit_options)
 
             if inherit_options:
-                slist.extend(self._get_ancestors())
+                if self._SETTINGS.ignore_case:
+                    opt = opt.lower()
+
+                # Note that if fallback is not specified, this returns None
+                # which is not a string as expected
+                return self._get_inherited().get(opt, fallback)
 
-            for s in slist:
-                for o in s._options:
-                    if (self._IGNORE_CASE and opt.lower() == o.lower()) or \
-                                          (not self._IGNORE_CASE and opt == o):
-                        return s._options[o]
+            o = self._find_option(opt)
+
+            if o is not None:
+                return self._options[o]
 
             else:
                 # Note that if fallback is not specified, this returns None
@@ -933,7 +1554,7 @@ class Section(object):
             overwrites it only for this call.
         """
         if inherit_options not in (True, False):
-            inherit_options = self._INHERIT_OPTIONS
+            inherit_options = self._SETTINGS.inherit_options
 
         return self.get(opt, fallback=fallback,
                                               inherit_options=inherit_options)
@@ -953,10 +1574,9 @@ class Section(object):
             overwrites it only for this call.
         """
         if inherit_options not in (True, False):
-            inherit_options = self._INHERIT_OPTIONS
+            inherit_options = self._SETTINGS.inherit_options
 
-        return int(self.get(opt, fallback=fallback,
-                                             inherit_options=inherit_options))
+        return self._get_converted(opt, int, int, fallback, inherit_options)
 
     def get_float(self, opt, fallback=None, inherit_options=None):
         """
@@ -973,10 +1593,10 @@ class Section(object):
             overwrites it only for this call.
         """
         if inherit_options not in (True, False):
-            inherit_options = self._INHERIT_OPTIONS
+            inherit_options = self._SETTINGS.inherit_options
 
-        return float(self.get(opt, fallback=fallback,
-                                             inherit_options=inherit_options))
+        return self._get_converted(opt, float, float, fallback,
+                                   inherit_options)
 
     def get_bool(self, opt, true=(), false=(), default=None, fallback=None,
                                                          inherit_options=None):
@@ -1009,20 +1629,76 @@ class Section(object):
         if default not in (True, False):
             default = self._GET_BOOLEAN_DEFAULT
         if inherit_options not in (True, False):
-            inherit_options = self._INHERIT_OPTIONS
+            inherit_options = self._SETTINGS.inherit_options
 
-        v = str(self.get(opt, fallback=fallback,
-                                      inherit_options=inherit_options)).lower()
-        if v in true:
-            return True
-        elif v in false:
-            return False
-        elif default in (True, False):
-            return default
-        else:
-            raise ValueError('Unrecognized boolean status: {}'.format(
+        def convert(value):
+            v = str(value).lower()
+
+            if v in true:
+                return True
+            elif v in false:
+                return False
+            elif default in (True, False):
+                return default
+            else:
+                raise ValueError('Unrecognized boolean status: {}'.format(
                                                                     self[opt]))
 
+        return self._get_converted(opt, (bool, tuple(true), tuple(false),
+                                   default), convert, fallback,
+                                   inherit_options)
+
+    def _get_converted(self, opt, converter, convert, fallback,
+                                                            inherit_options):
+        """
+        Auxiliary method for :py:meth:`get_int`, :py:meth:`get_float` and
+        :py:meth:`get_bool`.
+
+        Return the value of an option converted with a function; the result
+        is cached until the option (or, if inheriting, any option of the
+        ancestors) is changed. Fallback values are converted but not cached.
+
+        :param str opt: The name of the option whose value must be returned.
+        :param converter: A hashable object that identifies the conversion,
+            including its parameters.
+        :param convert: The function that converts the value.
+        :param fallback: The value to be converted if the option is not found.
+        :param bool inherit_options: Whether the option is inherited.
+        """
+        if not isinstance(opt, str):
+            raise TypeError('Option name must be a string: {}'.format(opt))
+
+        if self._ROOT._live_interpolation is not None:
+            # Live interpolated values can change without any change to the
+            #  option itself, so do not cache their conversions
+            value = self.get(opt, fallback=None,
+                             inherit_options=inherit_options)
+            return convert(fallback if value is None else value)
+
+        lopt = opt.lower() if self._SETTINGS.ignore_case else opt
+
+        if inherit_options:
+            cache = self._get_inherited().values
+        else:
+            if self._values is None:
+                self._values = {}
+
+            cache = self._values
+
+        try:
+            return cache[lopt][converter]
+        except KeyError:
+            pass
+
+        value = self.get(opt, fallback=None, inherit_options=inherit_options)
+
+        if value is None:
+            return convert(fallback)
+
+        converted = convert(value)
+        cache.setdefault(lopt, {})[converter] = converted
+        return converted
+
     def _get_ancestors(self):
         """
         Return a list with the ancestors of the current section, but not the
@@ -1065,25 +1741,36 @@ class Section(object):
             object, but this setting overwrites it only for this call.
         """
         if inherit_options not in (True, False):
-            inherit_options = self._INHERIT_OPTIONS
+            inherit_options = self._SETTINGS.inherit_options
+
+        if inherit_options:
+            options = self._get_inherited().get_ordered()
+        else:
+            options = self._options
 
+        # Option values are immutable strings, so copying the mapping is
+        #  enough
         if ordered:
-            d = self._DICT_CLASS()
+            return self._DICT_CLASS(options)
         else:
-            d = {}
+            return dict(options)
 
-        slist = [self, ]
+    def _get_inherited(self):
+        """
+        Return the :py:class:`_InheritedOptions` view of the section, building
+        it if needed.
+        """
+        view = self._inherited
 
-        if inherit_options:
-            slist.extend(self._get_ancestors())
+        if view is None:
+            if self._PARENT is None:
+                view = _InheritedOptions(self, None)
+            else:
+                view = _InheritedOptions(self, self._PARENT._get_inherited())
 
-        for s in slist:
-            for o in s._options:
-                d.setdefault(o, s._options[o][:])
-                # There should be no need to check _IGNORE_CASE, in fact it has
-                # already been done at importing time
+            self._inherited = view
 
-        return d
+        return view
 
     def get_sections(self):
         """
@@ -1119,6 +1806,286 @@ class Section(object):
 
         return d
 
+    def __reduce_ex__(self, protocol):
+        """
+        Support copying and pickling, loading first all the sections of a
+        lazily-loaded tree, since the memory map of the file cannot be
+        copied.
+        """
+        lazy = self._ROOT._lazy
+
+        if lazy is not None:
+            lazy.load_all()
+
+        return object.__reduce_ex__(self, protocol)
+
+    def clone(self):
+        """
+        Return a new :py:class:`ConfigFile` object whose root section is a
+        copy of the current section and its descendants.
+
+        Only the section objects are created: the options are shared with the
+        clone, and each section copies them only the first time either the
+        original or the clone modifies them (copy-on-write). Values are not
+        validated again. The clone has the same settings as the current
+        object, including live interpolation, the size of the path cache, the
+        parse and disk caches, and the options for reading files.
+
+        Cloning takes time proportional to the number of sections, and not to
+        the number of options.
+        """
+        root = self._ROOT
+        settings = self._SETTINGS
+        path_cache = root._path_cache
+        clone = ConfigFile(
+                    safe_calls=settings.safe_calls,
+                    inherit_options=settings.inherit_options,
+                    subsections=settings.subsections,
+                    ignore_case=settings.ignore_case,
+                    live_interpolation=root._live_interpolation is not None,
+                    path_cache_size=path_cache.maxsize if path_cache else 0,
+                    parse_cache=root._parse_cache or False,
+                    disk_cache=root._disk_cache,
+                    encoding=root._encoding)
+        # The settings are equal, share them
+        clone._SETTINGS = settings
+        stack = [(self, clone)]
+
+        while stack:
+            section, copy = stack.pop()
+            section._shared = True
+            copy._shared = True
+            copy._options = section._options
+            copy._options_index = section._options_index
+            copy._fingerprint = section._fingerprint
+
+            for name, subsection in section._subsections.items():
+                subcopy = Section(name=name, parent=copy, settings=settings)
+                copy._subsections[name] = subcopy
+                stack.append((subsection, subcopy))
+
+            if settings.ignore_case:
+                copy._subsections_index = dict(section._subsections_index)
+
+        return clone
+
+    def fingerprint(self):
+        """
+        Return a hash (a hexadecimal string) of the options and the
+        subsections of the section, including the names under which they are
+        stored and their order, but not the name of the section itself.
+
+        Two sections with the same fingerprint have the same contents, so two
+        trees, or two versions of the same tree, can be compared in constant
+        time. The fingerprint of each section is cached and it is computed
+        again only after the section or one of its descendants is modified,
+        reusing the fingerprints of the unmodified subsections.
+        """
+        if self._fingerprint is not None:
+            return self._fingerprint
+
+        stack = [(self, False)]
+
+        while stack:
+            section, expanded = stack.pop()
+
+            if not expanded:
+                stack.append((section, True))
+                stack.extend((subsection, False) for subsection in
+                             section._subsections.values()
+                             if subsection._fingerprint is None)
+                continue
+
+            h = hashlib.sha1()
+            # Length-prefix the names and values so that the encoding is
+            #  unambiguous
+            h.update(_encode_text(''.join(
+                            'o{}:{}{}:{}'.format(len(opt), opt, len(val), val)
+                            for opt, val in section._options.items())))
+
+            for name, subsection in section._subsections.items():
+                h.update(_encode_text('s{}:{}{}'.format(
+                            len(name), name, subsection._fingerprint)))
+
+            section._fingerprint = h.hexdigest()
+
+        return self._fingerprint
+
+    def diff(self, other):
+        """
+        Return a :py:class:`Changeset` with the differences that turn the
+        current section into another one; see :py:meth:`apply`.
+
+        The subsections with the same fingerprint (see :py:meth:`fingerprint`)
+        in both trees are skipped without examining their contents. The order
+        of options and subsections is not compared.
+
+        :param Section other: The section to compare with.
+        """
+        added_sections = []
+        removed_sections = []
+        added_options = []
+        changed_options = []
+        removed_options = []
+
+        stack = [((), self, other)]
+
+        while stack:
+            path, section, osection = stack.pop()
+
+            if section.fingerprint() == osection.fingerprint():
+                continue
+
+            for opt, val in section._options.items():
+                o = osection._find_option(opt)
+
+                if o is None:
+                    removed_options.append((path, opt))
+                elif osection._options[o] != val:
+                    changed_options.append((path, opt, osection._options[o]))
+
+            for opt, val in osection._options.items():
+                if section._find_option(opt) is None:
+                    added_options.append((path, opt, val))
+
+            for name, subsection in section._subsections.items():
+                osubsection = osection._find_subsection(name)
+
+                if osubsection is None:
+                    removed_sections.append(path + (name, ))
+                else:
+                    stack.append((path + (name, ), subsection, osubsection))
+
+            for name, osubsection in osection._subsections.items():
+                if section._find_subsection(name) is None:
+                    added = [(path + (name, ), osubsection)]
+
+                    while added:
+                        apath, asection = added.pop()
+                        added_sections.append(apath)
+                        added_options.extend((apath, opt, val) for opt, val
+                                             in asection._options.items())
+                        added.extend((apath + (n, ), ss) for n, ss in
+                                     asection._subsections.items())
+
+        return Changeset(added_sections, removed_sections, added_options,
+                         changed_options, removed_options)
+
+    def apply(self, changeset, overwrite=True, add=True):
+        """
+        Apply a :py:class:`Changeset` returned by :py:meth:`diff`.
+
+        All the names and values in the changeset are validated before the
+        section is modified, raising :py:exc:`InvalidObjectError` if any of
+        them is not valid. Then the removed options and sections are deleted,
+        ignoring those that do not exist, and the added sections, the added
+        options and the changed options are imported with
+        :py:meth:`_import_object`, so that the mode of the import is the same
+        as in the other import methods:
+
+        * by default, as in upgrade mode (see :py:meth:`upgrade`), all the
+          changes are applied;
+        * if ``add`` is False, as in update mode (see :py:meth:`update`), the
+          options and sections that do not exist are not added;
+        * if ``overwrite`` is False, as in add mode (see :py:meth:`add`), the
+          existing options are neither changed nor removed, and the existing
+          sections are not removed.
+
+        There is no reset mode, since a changeset only describes the
+        differences from another section and not its whole contents: use
+        :py:meth:`reset` with the other section instead.
+
+        :param Changeset changeset: The changes to apply.
+        :param bool overwrite: Whether the existing options and sections will
+            be changed or removed.
+        :param bool add: Whether the options and sections that do not exist
+            will be added.
+        """
+        re_i = self._SETTINGS.re_i
+
+        def check_path(path):
+            for name in path:
+                if not isinstance(name, str) or not re_.match(
+                                        self._SETTINGS.section, name, re_i):
+                    raise InvalidObjectError('Invalid section name: {}'
+                                             ''.format(name))
+
+        def check_option(opt, val=''):
+            if not isinstance(opt, str) or not isinstance(val, str) or \
+                                not re_.match(self._OPTION, opt, re_i) or \
+                                not re_.match(self._VALUE, val, re_i):
+                raise InvalidObjectError('Invalid option or value: {}: {}'
+                                         ''.format(opt, val))
+
+        for path in itertools.chain(changeset.added_sections,
+                                    changeset.removed_sections):
+            check_path(path)
+
+        for path, opt in changeset.removed_options:
+            check_path(path)
+            check_option(opt)
+
+        for path, opt, val in itertools.chain(changeset.added_options,
+                                              changeset.changed_options):
+            check_path(path)
+            check_option(opt, val)
+
+        if overwrite:
+            for path, opt in changeset.removed_options:
+                try:
+                    section = self(*path, safe=False)
+                except KeyError:
+                    continue
+
+                o = section._find_option(opt)
+
+                if o is not None:
+                    section._remove_option(o)
+
+            for path in changeset.removed_sections:
+                try:
+                    section = self(*path, safe=False)
+                except KeyError:
+                    continue
+
+                section.delete()
+
+        cobj = self._EMPTY_SECTION()
+
+        def get_node(path):
+            node = cobj
+
+            for name in path:
+                if name not in node[1]:
+                    node[1][name] = self._EMPTY_SECTION()
+
+                node = node[1][name]
+
+            return node
+
+        for path in changeset.added_sections:
+            get_node(path)
+
+        for path, opt, val in changeset.added_options:
+            get_node(path)[0][opt] = val
+
+        for path, opt, val in changeset.changed_options:
+            get_node(path)[0][opt] = val
+
+        self._import_object(cobj, overwrite=overwrite, add=add)
+
+    def freeze(self):
+        """
+        Return an immutable :py:class:`ConfigSnapshot` of the section and its
+        descendants.
+
+        The snapshot is fully indexed when it is created, and it is not
+        affected by later changes to the section, so it can be read from any
+        number of threads without locking, for example while the section is
+        being reloaded.
+        """
+        return ConfigSnapshot(self)
+
     def _recurse_tree(self, ordered=True):
         """
         Auxiliary recursor for :py:meth:`get_tree`.
@@ -1136,10 +2103,12 @@ class Section(object):
         return d
 
     def _export(self, targets, overwrite=True, add=True, reset=False,
-                                                                    path=True):
+                path=True, atomic=False, fsync=False, skip_unchanged=False):
         """
         Export the configuration to one or more files.
 
+        Return True if at least one file has been written.
+
         :param targets: A sequence with the target file names.
         :param bool overwrite: This sets whether sections and options in the
             file are overwritten; see _import_object for more details.
@@ -1147,12 +2116,24 @@ class Section(object):
             are added; see _import_object for more details.
         :param  bool path: If True, section names are exported with their full
             path.
+        :param bool atomic: If True, the files are rewritten atomically; see
+            :py:meth:`_export_file`.
+        :param bool fsync: If True, the data is flushed to disk before
+            returning; see :py:meth:`_export_file`.
+        :param bool skip_unchanged: If True, files whose contents would not
+            change are not written; see :py:meth:`_export_file`.
         """
         # TODO: Change "reset" mode to "remove" (complementing "overwrite" and
         #       "add") (bug #25)
+        written = False
+
         for f in targets:
-            self._export_file(f, overwrite=overwrite, add=add, reset=reset,
-                                                                    path=path)
+            if self._export_file(f, overwrite=overwrite, add=add, reset=reset,
+                                 path=path, atomic=atomic, fsync=fsync,
+                                 skip_unchanged=skip_unchanged):
+                written = True
+
+        return written
 
     def export_upgrade(self, *targets, **kwargs):
         """
@@ -1165,16 +2146,29 @@ class Section(object):
 
         See :py:meth:`_export_file` for object compatibility.
 
+        Return True if at least one file has been written.
+
         :param targets: A sequence with the target file names.
         :param bool path: If True, section names are exported with their full
             path.
+        :param bool atomic: If True, write to a temporary file in the same
+            directory and rename it over the target, so that the target is
+            never left truncated; see :py:meth:`_export_file`.
+        :param bool fsync: If True, flush the data to disk before returning.
+        :param bool skip_unchanged: If True, render the new contents in memory
+            and do not write the files whose contents would not change, so
+            that their modification times are preserved.
         """
         # Necessary for Python 2 compatibility
         # The Python 3 definition was:
         #def export_upgrade(self, *targets, path=True):
         path = kwargs.get('path', True)
+        atomic = kwargs.get('atomic', False)
+        fsync = kwargs.get('fsync', False)
+        skip_unchanged = kwargs.get('skip_unchanged', False)
 
-        self._export(targets, path=path)
+        return self._export(targets, path=path, atomic=atomic, fsync=fsync,
+                            skip_unchanged=skip_unchanged)
 
     def export_update(self, *targets, **kwargs):
         """
@@ -1187,16 +2181,29 @@ class Section(object):
 
         See :py:meth:`_export_file` for object compatibility.
 
+        Return True if at least one file has been written.
+
         :param targets: A sequence with the target file names.
         :param bool path: If True, section names are exported with their full
             path.
+        :param bool atomic: If True, write to a temporary file in the same
+            directory and rename it over the target, so that the target is
+            never left truncated; see :py:meth:`_export_file`.
+        :param bool fsync: If True, flush the data to disk before returning.
+        :param bool skip_unchanged: If True, render the new contents in memory
+            and do not write the files whose contents would not change, so
+            that their modification times are preserved.
         """
         # Necessary for Python 2 compatibility
         # The Python 3 definition was:
         #def export_upgrade(self, *targets, path=True):
         path = kwargs.get('path', True)
+        atomic = kwargs.get('atomic', False)
+        fsync = kwargs.get('fsync', False)
+        skip_unchanged = kwargs.get('skip_unchanged', False)
 
-        self._export(targets, add=False, path=path)
+        return self._export(targets, add=False, path=path, atomic=atomic,
+                            fsync=fsync, skip_unchanged=skip_unchanged)
 
     def export_reset(self, *targets, **kwargs):
         """
@@ -1209,16 +2216,29 @@ class Section(object):
 
         See :py:meth:`_export_file` for object compatibility.
 
+        Return True if at least one file has been written.
+
         :param targets: A sequence with the target file names.
         :param bool path: If True, section names are exported with their full
             path.
+        :param bool atomic: If True, write to a temporary file in the same
+            directory and rename it over the target, so that the target is
+            never left truncated; see :py:meth:`_export_file`.
+        :param bool fsync: If True, flush the data to disk before returning.
+        :param bool skip_unchanged: If True, render the new contents in memory
+            and do not write the files whose contents would not change, so
+            that their modification times are preserved.
         """
         # Necessary for Python 2 compatibility
         # The Python 3 definition was:
         #def export_upgrade(self, *targets, path=True):
         path = kwargs.get('path', True)
+        atomic = kwargs.get('atomic', False)
+        fsync = kwargs.get('fsync', False)
+        skip_unchanged = kwargs.get('skip_unchanged', False)
 
-        self._export(targets, reset=True, path=path)
+        return self._export(targets, reset=True, path=path, atomic=atomic,
+                            fsync=fsync, skip_unchanged=skip_unchanged)
 
     def export_add(self, *targets, **kwargs):
         """
@@ -1231,122 +2251,386 @@ class Section(object):
 
         See :py:meth:`_export_file` for object compatibility.
 
+        Return True if at least one file has been written.
+
         :param targets: A sequence with the target file names.
         :param bool path: If True, section names are exported with their full
             path.
+        :param bool atomic: If True, write to a temporary file in the same
+            directory and rename it over the target, so that the target is
+            never left truncated; see :py:meth:`_export_file`.
+        :param bool fsync: If True, flush the data to disk before returning.
+        :param bool skip_unchanged: If True, render the new contents in memory
+            and do not write the files whose contents would not change, so
+            that their modification times are preserved.
         """
         # Necessary for Python 2 compatibility
         # The Python 3 definition was:
         #def export_upgrade(self, *targets, path=True):
         path = kwargs.get('path', True)
+        atomic = kwargs.get('atomic', False)
+        fsync = kwargs.get('fsync', False)
+        skip_unchanged = kwargs.get('skip_unchanged', False)
+
+        return self._export(targets, overwrite=False, path=path, atomic=atomic,
+                            fsync=fsync, skip_unchanged=skip_unchanged)
+
+    def export_stream(self, stream, **kwargs):
+        """
+        Write the sections and options to a stream, for example a socket or a
+        pipe, as they would be exported to a new file.
+
+        :param stream: A writable stream; if it is an instance of
+            :py:class:`io.RawIOBase` or :py:class:`io.BufferedIOBase`, or its
+            ``mode`` attribute contains ``b``, the text is encoded, otherwise
+            it is written as is.
+        :param bool path: If True, section names are exported with their full
+            path.
+        :param str encoding: The encoding for binary streams.
+        """
+        # Necessary for Python 2 compatibility
+        # The Python 3 definition was:
+        #def export_stream(self, stream, path=True, encoding='utf-8'):
+        path = kwargs.get('path', True)
+        encoding = kwargs.get('encoding', 'utf-8')
+
+        if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)) or \
+                                    'b' in getattr(stream, 'mode', ''):
+            chunks = self.iter_export(path=path, encoding=encoding)
+        else:
+            chunks = self.iter_export(path=path)
+
+        for chunk in chunks:
+            stream.write(chunk)
+
+    def iter_export(self, **kwargs):
+        """
+        Generate the text of the sections and options, as they would be
+        exported to a new file, in chunks: one for the options of the current
+        section, if any, and one for each section with options.
+
+        The chunks are rendered only when they are requested, so they can be
+        sent while the rest of the tree is still being rendered, for example
+        in an HTTP response.
+
+        :param bool path: If True, section names are exported with their full
+            path.
+        :param str encoding: If set, the chunks are encoded to bytes with this
+            encoding.
+        """
+        # Necessary for Python 2 compatibility
+        # The Python 3 definition was:
+        #def iter_export(self, path=True, encoding=None):
+        path = kwargs.get('path', True)
+        encoding = kwargs.get('encoding')
 
-        self._export(targets, overwrite=False, path=path)
+        # The options of the current section are not under any section header
+        #  if it is the root section or if path is False
+        separate = (not path or self._PARENT is None) and \
+                                                    len(self._options) > 0
+
+        if separate:
+            chunk = "".join("".join((option, self._OPTION_SEP, value, "\n"))
+                            for option, value in self._options.items())
+            yield chunk if encoding is None else chunk.encode(encoding)
+
+        for chunk in self._render_sections(self._export_plan(path)[1],
+                                           separate):
+            yield chunk if encoding is None else chunk.encode(encoding)
 
     def _export_file(self, cfile, overwrite=True, add=True, reset=False,
-                                                                    path=True):
+                path=True, atomic=False, fsync=False, skip_unchanged=False):
         """
         Export the sections tree to a file.
 
+        Return True if the file has been written.
+
         :param str efile: The target file name.
         :param bool overwrite: Whether sections and options already existing in
             the file are overwritten.
         :param bool add: Whether non-pre-existing data will be exported.
         :param bool path: If True, section names are exported with their full
             path.
+        :param bool atomic: If False, the existing file is read in memory and
+            then overwritten in place; if True, it is read line by line while
+            the new contents are written to a temporary file in the same
+            directory, which then atomically replaces the target, so that the
+            target is never left truncated and memory usage does not depend on
+            its size.
+        :param bool fsync: If True, flush the new contents (and, if atomic,
+            the directory entry) to disk before returning.
+        :param bool skip_unchanged: If True, the new contents are rendered in
+            memory (regardless of atomic) and compared with the bytes of the
+            existing file, which is read only once, and the file is not
+            written if they are the same.
+        """
+        lazy = self._ROOT._lazy
+
+        if lazy is not None and not atomic:
+            # The lazily-loaded file must not be overwritten in place while it
+            #  is mapped in memory
+            lazy.release(cfile)
+
+        if skip_unchanged:
+            data = self._render_file(cfile, overwrite, add, reset, path)
+
+            if data is None:
+                return False
+
+            write = lambda lines, stream: stream.write(data)
+            mode = 'wb'
+        else:
+            write = lambda lines, stream: self._export_lines(lines, stream,
+                                            overwrite, add, reset, path)
+            mode = 'w'
+
+        if atomic:
+            self._export_file_atomic(cfile, write, mode, fsync)
+            return True
+
+        if skip_unchanged:
+            lines = ()
+        else:
+            try:
+                with self._open_text_file(cfile, 'r') as stream:
+                    lines = stream.readlines()
+            except IOError:
+                lines = []
+
+        with (open(cfile, mode) if mode == 'wb' else
+              self._open_text_file(cfile, mode)) as stream:
+            write(lines, stream)
+
+            if fsync:
+                stream.flush()
+                os.fsync(stream.fileno())
+
+        return True
+
+    def _render_file(self, cfile, overwrite, add, reset, path):
+        """
+        Auxiliary method for :py:meth:`_export_file`.
+
+        Return the new contents of a file as bytes, encoded and with the line
+        separators translated as :py:meth:`_open_text_file` would write them,
+        or None if the file already contains exactly those bytes.
         """
         try:
-            with open(cfile, 'r') as stream:
-                lines = stream.readlines()
+            with open(cfile, 'rb') as stream:
+                existing = stream.read()
         except IOError:
-            lines = []
+            existing = None
+
+        encoding = self._get_file_encoding()
+
+        if encoding is None:
+            # In Python 2 without an encoding the values are written as bytes
+            lines = io.BytesIO(existing or b'')
+            buffer_ = io.BytesIO()
         else:
-            # Exclude leading blank lines
-            for lineN, line in enumerate(lines):
-                if not re_.match(self._PARSE_IGNORE, line, self._RE_I):
-                    lines = lines[lineN:]
-                    break
-            else:
-                lines = []
+            lines = io.TextIOWrapper(io.BytesIO(existing or b''),
+                                     encoding=encoding)
+            buffer_ = io.StringIO()
 
-        with open(cfile, 'w') as stream:
-            BASE_SECTION = self
+        self._export_lines(lines, buffer_, overwrite, add, reset, path)
+        data = buffer_.getvalue()
 
-            try:
-                ROOT_SECTION = self._get_ancestors()[-1]
-            except IndexError:
-                ROOT_SECTION = self
-                readonly_section = False
-                remaining_descendants = []
-            else:
-                if path:
-                    readonly_section = True
-                    remaining_descendants = [BASE_SECTION, ]
+        if os.linesep != '\n':
+            data = data.replace('\n', os.linesep)
+
+        if encoding is not None:
+            data = data.encode(encoding)
+
+        if data == existing:
+            return None
+
+        return data
+
+    def _export_file_atomic(self, cfile, write, mode, fsync):
+        """
+        Auxiliary method for :py:meth:`_export_file`.
+
+        Export the sections tree to a temporary file and rename it over the
+        target file.
+
+        :param write: A function that writes the new contents to the stream
+            of the temporary file, given an iterable of the lines of the
+            target file.
+        :param str mode: The mode for opening the temporary file.
+        """
+        # Replace the target of a symbolic link, not the link itself
+        cfile = os.path.realpath(cfile)
+        directory = os.path.dirname(cfile)
+        fd, temp = tempfile.mkstemp(prefix='.{}.'.format(
+                                    os.path.basename(cfile)), suffix='.tmp',
+                                    dir=directory)
+
+        try:
+            with (os.fdopen(fd, mode) if mode == 'wb' else
+                  self._open_text_file(fd, mode)) as stream:
+                try:
+                    source = self._open_text_file(cfile, 'r')
+                except IOError:
+                    write((), stream)
+                    # mkstemp creates the file readable only by the owner, so
+                    #  apply the permissions of a file created with open()
+                    umask = os.umask(0)
+                    os.umask(umask)
+                    permissions = 0o666 & ~umask
                 else:
-                    # The options without a section (i.e. at the top of the
-                    #  file) must be considered part of the current section if
-                    #  path is False
-                    readonly_section = False
-                    remaining_descendants = []
-
-            remaining_options = BASE_SECTION.get_options(inherit_options=False)
-            remaining_descendants.extend(BASE_SECTION._get_descendants())
-            other_lines = []
-
-            for line in lines:
-                re_option = re_.match(self._PARSE_OPTION, line, self._RE_I)
-
-                if re_option:
-                    # This also changes other_lines in place
-                    self._export_other_lines(stream, other_lines,
-                                                    readonly_section, reset)
-
-                    self._export_file_existing_option(stream, line, re_option,
-                                        readonly_section, remaining_options,
-                                        overwrite, reset)
-                    continue
+                    with source:
+                        write(source, stream)
+                        permissions = stat.S_IMODE(os.fstat(
+                                                    source.fileno()).st_mode)
+
+                stream.flush()
 
-                re_section = re_.match(self._PARSE_SECTION, line, self._RE_I)
+                if fsync:
+                    os.fsync(stream.fileno())
 
-                if re_section:
-                    if add:
-                        self._export_file_remaining_options(stream,
-                                        readonly_section, remaining_options)
+            os.chmod(temp, permissions)
+            _replace_file(temp, cfile)
+        except BaseException:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+
+            raise
+
+        if fsync:
+            # Also make the rename durable; directories cannot be opened on
+            #  some platforms
+            try:
+                dirfd = os.open(directory, os.O_RDONLY)
+            except OSError:
+                return
+
+            try:
+                os.fsync(dirfd)
+            finally:
+                os.close(dirfd)
+
+    def _export_lines(self, lines, stream, overwrite, add, reset, path):
+        """
+        Auxiliary method for :py:meth:`_export_file`.
 
-                    # This also changes other_lines in place
-                    self._export_other_lines_before_existing_section(stream,
-                                        other_lines, readonly_section, reset)
+        Write the sections tree to a stream, merging it with the lines of the
+        existing file, which are read one at a time.
 
-                    # This also changes remaining_descendants in place
-                    (readonly_section, remaining_options) = \
-                                            self._export_file_existing_section(
-                                            stream, line, re_section,
-                                            ROOT_SECTION, BASE_SECTION,
-                                            remaining_descendants, path)
+        :param lines: An iterable of the lines of the existing file.
+        :param stream: The writable stream.
+        """
+        # The options without a section (i.e. at the top of the file) must be
+        #  considered part of the current section if it is the root section
+        #  or if path is False
+        readonly_section = path and self._PARENT is not None
+        remaining_options = self.get_options(inherit_options=False)
+        options_index = self._options_index
+        (sections, remaining_sections) = self._export_plan(path)
+        other_lines = []
+        # Exclude leading blank lines
+        leading = True
+
+        for line in lines:
+            if leading:
+                if re_.match(self._PARSE_IGNORE, line, self._SETTINGS.re_i):
                     continue
 
-                # Comments, ignored/invalid lines
-                other_lines.append(line)
+                leading = False
 
-            if add:
-                self._export_file_remaining_options(stream, readonly_section,
-                                                            remaining_options)
-
-            # Don't use _export_other_lines_before_existing_section here
-            #  because any pre-existing unrecognized lines must be restored in
-            #  any case, and since they're at the end of the original file,
-            #  they weren't meant to separate any further sections, so let
-            #  _export_file_remaining_sections handle the addition of a blank
-            #  line
-            # This also changes other_lines in place
-            self._export_other_lines(stream, other_lines, readonly_section,
-                                                                        reset)
+            re_option = re_.match(self._PARSE_OPTION, line,
+                                                self._SETTINGS.re_i)
 
-            if add:
-                self._export_file_remaining_sections(stream, BASE_SECTION,
-                                                remaining_descendants, path)
+            if re_option:
+                # This also changes other_lines in place
+                self._export_other_lines(stream, other_lines,
+                                                readonly_section, reset)
+
+                self._export_file_existing_option(stream, line, re_option,
+                                    readonly_section, remaining_options,
+                                    options_index, overwrite, reset)
+                continue
+
+            re_section = re_.match(self._PARSE_SECTION, line,
+                                                self._SETTINGS.re_i)
+
+            if re_section:
+                if add:
+                    self._export_file_remaining_options(stream,
+                                    readonly_section, remaining_options)
+
+                # This also changes other_lines in place
+                self._export_other_lines_before_existing_section(stream,
+                                    other_lines, readonly_section, reset)
+
+                # This also changes remaining_sections in place
+                (readonly_section, remaining_options, options_index) = \
+                                        self._export_file_existing_section(
+                                        stream, line, re_section, sections,
+                                        remaining_sections)
+                continue
+
+            # Comments, ignored/invalid lines
+            other_lines.append(line)
+
+        if add:
+            self._export_file_remaining_options(stream, readonly_section,
+                                                        remaining_options)
+
+        # Don't use _export_other_lines_before_existing_section here
+        #  because any pre-existing unrecognized lines must be restored in
+        #  any case, and since they're at the end of the original file,
+        #  they weren't meant to separate any further sections, so let
+        #  _export_file_remaining_sections handle the addition of a blank
+        #  line
+        # This also changes other_lines in place
+        self._export_other_lines(stream, other_lines, readonly_section,
+                                                                    reset)
+
+        if add:
+            self._export_file_remaining_sections(stream, remaining_sections)
+
+    def _export_plan(self, path):
+        """
+        Auxiliary method for :py:meth:`_export_lines`.
+
+        Return a dictionary that maps the paths of the sections to be exported
+        (normalized as by :py:meth:`_normalize_path`) to the sections, and an
+        ordered dictionary that maps the same sections, in the order in which
+        they must be added to the file, to the names in their paths.
+        """
+        if path and self._PARENT is not None:
+            names = [self._NAME, ]
+            names.extend(ancestor._NAME for ancestor in
+                         self._get_ancestors()[:-1])
+            names.reverse()
+            names = tuple(names)
+        else:
+            # The current section is not named in the file
+            names = ()
+
+        sections = {}
+        remaining_sections = self._DICT_CLASS()
+        stack = [(self, names)]
+
+        while stack:
+            (section, names) = stack.pop()
+
+            if names:
+                sections[self._normalize_path(names)] = section
+                remaining_sections[section] = names
+
+            # Reverse the subsections so that they are popped in order, each
+            #  one followed by its own descendants
+            stack.extend((subsection, names + (name, )) for name, subsection
+                         in reversed(tuple(section._subsections.items())))
+
+        return (sections, remaining_sections)
 
     def _export_file_existing_option(self, stream, line, re_option,
-                        readonly_section, remaining_options, overwrite, reset):
+                        readonly_section, remaining_options, options_index,
+                        overwrite, reset):
         """
         Auxiliary method for :py:meth:`_export_file`.
 
@@ -1356,23 +2640,23 @@ class Section(object):
             stream.write(line)
             return True
 
-        if self._IGNORE_CASE:
-            for option in remaining_options:
-                fkey = re_option.group(1)
-                fvalue = re_option.group(2)
+        if self._SETTINGS.ignore_case:
+            fkey = re_option.group(1)
+            fvalue = re_option.group(2)
+            option = options_index.get(fkey.lower())
 
-                if fkey.lower() == option.lower():
-                    if overwrite and fvalue != remaining_options[option]:
-                        stream.write(''.join((fkey, self._OPTION_SEP,
+            if option in remaining_options:
+                if overwrite and fvalue != remaining_options[option]:
+                    stream.write(''.join((fkey, self._OPTION_SEP,
                                             remaining_options[option], '\n')))
-                    else:
-                        stream.write(line)
+                else:
+                    stream.write(line)
 
-                    del remaining_options[option]
+                del remaining_options[option]
 
-                    # There shouldn't be more occurrences of this option (even
-                    #  with different casing)
-                    return True
+                # There shouldn't be more occurrences of this option (even
+                #  with different casing)
+                return True
 
         else:
             fkey = re_option.group(1)
@@ -1409,40 +2693,34 @@ class Section(object):
                                             remaining_options[option], '\n')))
 
     def _export_file_existing_section(self, stream, line, re_section,
-                    ROOT_SECTION, BASE_SECTION, remaining_descendants, path):
+                                            sections, remaining_sections):
         """
         Auxiliary method for :py:meth:`_export_file`.
 
         Write the section currently examined from the destination file.
         """
-        if self._ENABLE_SUBSECTIONS:
+        if self._SETTINGS.subsections:
             names = re_section.group(1).split(self._SECTION_SEP)
         else:
             names = (re_section.group(1), )
 
-        current_section = ROOT_SECTION if path else BASE_SECTION
+        current_section = sections.get(self._normalize_path(names))
 
-        for name in names:
-            try:
-                current_section = current_section(name)
-            except KeyError:
-                # The currently parsed section is not in the configuration
-                #  object
-                readonly_section = True
-                remaining_options = self._DICT_CLASS()
-                break
+        if current_section is None:
+            # The currently parsed section is not in the configuration object
+            #  or not under the exported section
+            readonly_section = True
+            remaining_options = self._DICT_CLASS()
+            options_index = None
         else:
-            alist = [current_section, ]
-            alist.extend(current_section._get_ancestors())
-
-            if BASE_SECTION in alist:
-                readonly_section = False
-                remaining_options = current_section.get_options(
+            # If the section is repeated in the file, its options are
+            #  exported again under each occurrence, so that the last one,
+            #  which wins when importing, is up to date
+            readonly_section = False
+            remaining_options = current_section.get_options(
                                                         inherit_options=False)
-                remaining_descendants.remove(current_section)
-            else:
-                readonly_section = True
-                remaining_options = self._DICT_CLASS()
+            options_index = current_section._options_index
+            remaining_sections.pop(current_section, None)
 
         # TODO: If reset (which for all the other modes by default is "deep",
         #       i.e. it must affect the subsections too) this section and all
@@ -1450,10 +2728,9 @@ class Section(object):
         #       (bug #22)
         stream.write(line)
 
-        return (readonly_section, remaining_options)
+        return (readonly_section, remaining_options, options_index)
 
-    def _export_file_remaining_sections(self, stream, BASE_SECTION,
-                                                remaining_descendants, path):
+    def _export_file_remaining_sections(self, stream, remaining_sections):
         """
         Auxiliary method for :py:meth:`_export_file`.
 
@@ -1461,26 +2738,30 @@ class Section(object):
         were not found in the destination file.
         """
         # Do not add an empty line if at the start of the file
-        BR = "\n" if stream.tell() > 0 else ""
+        stream.writelines(self._render_sections(remaining_sections,
+                                                stream.tell() > 0))
 
-        for section in remaining_descendants:
-            if len(section._options) > 0:
-                ancestors = [section._NAME, ]
+    def _render_sections(self, sections, separate):
+        """
+        Generate the text of the given sections that have options, one
+        section at a time.
 
-                for ancestor in section._get_ancestors()[:-1]:
-                    if not path and ancestor is BASE_SECTION:
-                        break
-
-                    ancestors.append(ancestor._NAME)
+        :param sections: An ordered mapping of the sections to the names in
+            their paths, as returned by :py:meth:`_export_plan`.
+        :param bool separate: Whether the first section must be preceded by a
+            blank line.
+        """
+        BR = "\n" if separate else ""
 
-                ancestors.reverse()
+        for section, names in sections.items():
+            if len(section._options) > 0:
+                chunk = [BR, self._SECTION_MARKERS.format(
+                                        self._SECTION_SEP.join(names)), "\n"]
 
-                stream.write("".join((BR, self._SECTION_MARKERS, "\n")
-                                ).format(self._SECTION_SEP.join(ancestors)))
+                for option, value in section._options.items():
+                    chunk.extend((option, self._OPTION_SEP, value, "\n"))
 
-                for option in section._options:
-                    stream.write("".join((option, self._OPTION_SEP,
-                                                    section[option], "\n")))
+                yield "".join(chunk)
 
                 # All the subsequent sections will need a blank line in any
                 #  case (do not add a double line break after the last option
@@ -1515,6 +2796,9 @@ class ConfigFile(Section):
     """
     The main configuration object.
     """
+    __slots__ = ('_path_cache', '_live_interpolation', '_parse_cache',
+                 '_disk_cache', '_encoding', '_lazy')
+
     def __init__(self, *sources, **kwargs):
         """
         Constructor.
@@ -1540,6 +2824,55 @@ class ConfigFile(Section):
             ``${section$:section$:option$}``. Options will be interpolated only
             once at importing: all links among options will be lost after
             importing.
+        :param bool defer_interpolation: If True, interpolate values only once
+            after importing all the sources; see :py:meth:`Section._import`.
+        :param bool live_interpolation: If True, option values are stored
+            uninterpolated, and they are interpolated when they are read with
+            :py:meth:`Section.get` (and the methods based on it), so links
+            among options are preserved; interpolated values are cached until
+            any option they depend on is changed. The ``interpolation``
+            arguments of the importing methods are ignored.
+            :py:meth:`Section.get_options`, :py:meth:`Section.get_tree`,
+            :py:meth:`Section.freeze` and the exporting methods keep returning
+            the uninterpolated values.
+        :param int path_cache_size: The maximum number of resolved section
+            paths (see :py:meth:`Section.__call__`) that are cached; 0
+            disables the cache. See :py:meth:`path_cache_info`.
+        :param parse_cache: If True, the tokens parsed from the file sources
+            (also by the importing methods of any section of the tree) are
+            looked up in and stored into the process-wide
+            :py:data:`PARSE_CACHE`; a :py:class:`ParseCache` object to use
+            instead; or False (default) to always parse the files. Files with
+            the same path, device, inode, size and modification time are
+            considered unchanged.
+        :param str disk_cache: The name of a directory where the tokens
+            parsed from the file sources (also by the importing methods of any
+            section of the tree) are stored, one file per source; it is
+            created, only accessible by the current user, if it does not
+            exist. The cached tokens are loaded instead of parsing the file
+            again as long as its path, device, inode, size and modification
+            time do not change, without reading the file. Only the cache
+            files owned by the current user and not writable by others are
+            loaded; those that cannot be written are silently skipped. If None
+            (default) the disk cache is disabled.
+        :param str encoding: The encoding of the file sources (also when
+            imported by the importing methods of any section of the tree) and
+            of the files written by the exporting methods; by default the
+            platform's default encoding.
+        :param bool lazy: If True, the only source, which must be a file name,
+            is indexed instead of being imported: the first pass only records
+            where each section of the file starts and ends, and the options of
+            a section are parsed only when the section is first accessed, for
+            example when it is resolved by :py:meth:`Section.__call__` or when
+            it is iterated. The file is read through a memory map, and it must
+            not be modified until all the needed sections have been accessed
+            (but the exporting methods can replace it); its encoding must be
+            ASCII-compatible, so for example UTF-16 is not supported. Errors in
+            the options of a section are only raised when the section is
+            accessed. Sections can be accessed concurrently by multiple
+            threads; copying or pickling the object loads all the sections
+            first. Lazy loading cannot be combined with interpolation or with
+            the parse and disk caches.
         """
         # The Python 3 definition was:
         #def __init__(self,
@@ -1549,7 +2882,14 @@ class ConfigFile(Section):
         #             inherit_options=False,
         #             subsections=True,
         #             ignore_case=True,
-        #             interpolation=False):
+        #             interpolation=False,
+        #             defer_interpolation=False,
+        #             live_interpolation=False,
+        #             path_cache_size=256,
+        #             parse_cache=False,
+        #             disk_cache=None,
+        #             encoding=None,
+        #             lazy=False):
         # But to keep compatibility with Python 2 it has been changed to the
         # current
         mode = kwargs.get('mode', 'upgrade')
@@ -1558,6 +2898,13 @@ class ConfigFile(Section):
         subsections = kwargs.get('subsections', True)
         ignore_case = kwargs.get('ignore_case', True)
         interpolation = kwargs.get('interpolation', False)
+        defer_interpolation = kwargs.get('defer_interpolation', False)
+        live_interpolation = kwargs.get('live_interpolation', False)
+        path_cache_size = kwargs.get('path_cache_size', 256)
+        parse_cache = kwargs.get('parse_cache', False)
+        disk_cache = kwargs.get('disk_cache')
+        encoding = kwargs.get('encoding')
+        lazy = kwargs.get('lazy', False)
 
         # Root section
         Section.__init__(self, name=None, parent=None,
@@ -1566,6 +2913,24 @@ class ConfigFile(Section):
                                             subsections=subsections,
                                             ignore_case=ignore_case)
 
+        self._path_cache = _PathCache(path_cache_size) if path_cache_size \
+                                                                    else None
+        self._live_interpolation = _LiveInterpolator(self) if \
+                                                live_interpolation else None
+
+        if parse_cache is True:
+            self._parse_cache = PARSE_CACHE
+        else:
+            self._parse_cache = parse_cache or None
+
+        if disk_cache is True:
+            raise ValueError('The disk cache requires the name of a '
+                             'directory')
+
+        self._disk_cache = disk_cache or None
+        self._encoding = encoding
+        self._lazy = None
+
         try:
             overwrite, add, reset = {
                 "upgrade": (True, True, False),
@@ -1576,8 +2941,1461 @@ class ConfigFile(Section):
         except KeyError:
             raise ValueError('Unrecognized importing mode: {}'.format(mode))
 
+        if lazy:
+            if len(sources) != 1 or not isinstance(sources[0], str):
+                raise ValueError('Lazy loading requires a single file name')
+
+            if interpolation or live_interpolation or parse_cache or \
+                                                                disk_cache:
+                raise ValueError('Lazy loading cannot be combined with '
+                                 'interpolation or caches')
+
+            # In update mode nothing would be imported into the empty object
+            if add:
+                self._lazy = _LazyIndex(self, sources[0])
+                self._lazy.load(self)
+
+            return
+
         self._import(sources, overwrite=overwrite, add=add, reset=reset,
-                                                interpolation=interpolation)
+                     interpolation=interpolation,
+                     defer_interpolation=defer_interpolation)
+
+    def path_cache_info(self):
+        """
+        Return a :py:class:`PathCacheInfo` named tuple with the statistics of
+        the cache of resolved section paths, or None if the cache is disabled.
+
+        The cache maps multi-name paths, for example
+        ``root('Section', 'Subsection')``, to the resolved subsections; it is
+        invalidated as a whole whenever any section in the tree is created or
+        deleted.
+        """
+        if self._path_cache is None:
+            return None
+
+        return self._path_cache.info()
+
+
+class ConfigSnapshot(object):
+    """
+    An immutable, indexed copy of a :py:class:`Section` and its descendants,
+    created with :py:meth:`Section.freeze`.
+
+    Sections are addressed by their path relative to the frozen section, as
+    a tuple of names (the empty tuple is the frozen section itself). If the
+    configuration ignores case, paths and option names can be given in any
+    casing, but those spelled as in the configuration are found without
+    lowercasing them. If the configuration inherits options, the options of
+    each section include the inherited ones.
+    """
+    __slots__ = ('_ignore_case', '_sections', '_paths')
+
+    def __init__(self, section):
+        """
+        Constructor.
+
+        :param Section section: The section to be frozen.
+        """
+        self._ignore_case = section._SETTINGS.ignore_case
+        # Map the paths to the frozen sections, each a 4-tuple with a
+        #  dictionary for option lookups, the ordered options (as returned by
+        #  Section.get_options), the tuple of the names of the subsections
+        #  and the ordered options of the section itself, without the
+        #  inherited ones; if ignoring case, the paths and the option names
+        #  are stored both as they are spelled in the configuration and
+        #  lowercased
+        self._sections = {}
+        # The paths as spelled in the configuration, in tree order
+        self._paths = []
+
+        stack = [((), section)]
+
+        while stack:
+            path, section = stack.pop()
+            options = section.get_options()
+            lookup = dict(options)
+
+            if self._ignore_case:
+                index = section._get_inherited().get_index() if \
+                        section._SETTINGS.inherit_options else \
+                        dict((opt.lower(), val) for opt, val in
+                             section._options.items())
+                lookup.update(index)
+
+                # An inherited option may be spelled differently from the
+                #  option that overrides it, so the exact spellings must be
+                #  resolved through the index too
+                for opt in options:
+                    lookup[opt] = index[opt.lower()]
+
+            own_options = section.get_options(inherit_options=False) if \
+                          section._SETTINGS.inherit_options else options
+            frozen = (lookup, options, tuple(section._subsections),
+                      own_options)
+            self._sections[path] = frozen
+            self._paths.append(path)
+
+            if self._ignore_case:
+                self._sections.setdefault(tuple(name.lower() for name in
+                                                path), frozen)
+
+            stack.extend(reversed([(path + (name, ), subsection) for
+                                   name, subsection in
+                                   section._subsections.items()]))
+
+    def _find(self, path):
+        """
+        Return the frozen section at the given path, or None.
+        """
+        path = tuple(path)
+
+        try:
+            return self._sections[path]
+        except KeyError:
+            if self._ignore_case:
+                return self._sections.get(tuple(name.lower() for name in
+                                                path))
+
+            return None
+
+    def get(self, path, opt, fallback=None):
+        """
+        Return the value of an option.
+
+        :param tuple path: The path of the section.
+        :param str opt: The name of the option.
+        :param fallback: The value returned if the section or the option do
+            not exist.
+        """
+        frozen = self._find(path)
+
+        if frozen is None:
+            return fallback
+
+        try:
+            return frozen[0][opt]
+        except KeyError:
+            if self._ignore_case:
+                return frozen[0].get(opt.lower(), fallback)
+
+            return fallback
+
+    def get_options(self, path=()):
+        """
+        Return a new ordered dictionary with the options of a section.
+
+        :param tuple path: The path of the section.
+        """
+        frozen = self._find(path)
+
+        if frozen is None:
+            raise KeyError('Section not found: {}'.format(path))
+
+        return frozen[1].copy()
+
+    def get_sections(self, path=()):
+        """
+        Return a tuple with the names of the child sections of a section.
+
+        :param tuple path: The path of the section.
+        """
+        frozen = self._find(path)
+
+        if frozen is None:
+            raise KeyError('Section not found: {}'.format(path))
+
+        return frozen[2]
+
+    def has_section(self, path):
+        """
+        Return True if a section exists.
+
+        :param tuple path: The path of the section.
+        """
+        return self._find(path) is not None
+
+    def paths(self):
+        """
+        Return an iterator over the paths of all the sections, in tree order.
+        """
+        return iter(self._paths)
+
+    def get_tree(self, path=()):
+        """
+        Return a compatible object (see :py:meth:`Section._import_object`)
+        with the options and subsections of a section; as with
+        :py:meth:`Section.get_tree`, inherited options are not included.
+
+        :param tuple path: The path of the section.
+        """
+        frozen = self._find(path)
+
+        if frozen is None:
+            raise KeyError('Section not found: {}'.format(path))
+
+        path = tuple(path)
+        return (frozen[3].copy(), collections.OrderedDict(
+                (name, self.get_tree(path + (name, ))) for name in frozen[2]))
+
+
+class ConfigOverlay(object):
+    """
+    A stack of configuration layers, each an immutable
+    :py:class:`ConfigSnapshot`, read as if they were merged in upgrade mode
+    (see :py:meth:`Section.upgrade`) without actually merging them.
+
+    Lookups fall through the layers from the most recently pushed to the
+    first one, so each layer keeps its own data and pushing or removing a
+    layer does not require rebuilding anything. Sections are addressed by
+    their path tuples, as in :py:class:`ConfigSnapshot`.
+
+    This is a separate class rather than a mode of :py:class:`ConfigFile`,
+    because every method of a section (importing, exporting, interpolation,
+    the caches) works on the single tree of options that the section owns:
+    the overlay only offers lookups, writes to the top layer, the merged
+    tree and :py:meth:`materialize`, which returns a regular object.
+    """
+    __slots__ = ('_kwargs', '_inherit_options', '_layers', '_order',
+                 '_counter')
+
+    def __init__(self, *sources, **kwargs):
+        """
+        Constructor.
+
+        :param sources: A sequence of files, file-like objects, dictionaries
+            and/or special objects, each pushed as a layer with
+            :py:meth:`push`.
+        :param bool inherit_options: If True, if an option is not found in a
+            section, it is searched in the parent sections, across all the
+            layers.
+        :param bool ignore_case: See :py:class:`ConfigFile`.
+        :param bool subsections: See :py:class:`ConfigFile`.
+        """
+        # The Python 3 definition was:
+        #def __init__(self,
+        #             *sources,
+        #             inherit_options=False,
+        #             subsections=True,
+        #             ignore_case=True):
+        # But to keep compatibility with Python 2 it has been changed to the
+        # current
+        self._inherit_options = kwargs.get('inherit_options', False)
+        # Inheritance is resolved by the overlay across the layers, so the
+        #  layers themselves must not inherit options
+        self._kwargs = {
+            'subsections': kwargs.get('subsections', True),
+            'ignore_case': kwargs.get('ignore_case', True),
+        }
+        self._layers = collections.OrderedDict()
+        # The layers from the top to the bottom, rebuilt when needed
+        self._order = ()
+        self._counter = 0
+
+        for source in sources:
+            self.push(source)
+
+    def push(self, source, name=None):
+        """
+        Add a layer on top of the others and return its name.
+
+        :param source: A file, file-like object, dictionary or special object.
+        :param name: A hashable name for the layer; by default it is the file
+            name if source is a string, otherwise a progressive number.
+        """
+        if name is None:
+            if isinstance(source, str):
+                name = source
+            else:
+                name = self._counter
+
+        if name in self._layers:
+            raise ValueError('Layer already exists: {}'.format(name))
+
+        self._counter += 1
+        self._layers[name] = ConfigFile(source, **self._kwargs).freeze()
+        self._order = None
+        return name
+
+    def remove(self, name):
+        """
+        Remove a layer.
+
+        :param name: The name of the layer.
+        """
+        del self._layers[name]
+        self._order = None
+
+    def layers(self):
+        """
+        Return a list with the names of the layers, from the bottom to the top.
+        """
+        return list(self._layers)
+
+    def _get_order(self):
+        """
+        Return a tuple with the (name, layer) pairs from the top to the bottom.
+        """
+        if self._order is None:
+            self._order = tuple(reversed(list(self._layers.items())))
+
+        return self._order
+
+    def _lookup(self, path, opt):
+        """
+        Return a (layer name, value) tuple for an option, or None.
+        """
+        path = tuple(path)
+        # If inheriting, also search the ancestors, each in all the layers
+        #  before the next one, as a merged section would do
+        paths = [path[:length] for length in range(len(path), -1, -1)] if \
+                                            self._inherit_options else [path]
+
+        for path in paths:
+            for name, layer in self._get_order():
+                value = layer.get(path, opt)
+
+                if value is not None:
+                    return (name, value)
+
+        return None
+
+    def get(self, path, opt, fallback=None):
+        """
+        Return the value of an option from the topmost layer that has it.
+
+        :param tuple path: The path of the section.
+        :param str opt: The name of the option.
+        :param fallback: The value returned if the option is not found.
+        """
+        found = self._lookup(path, opt)
+        return fallback if found is None else found[1]
+
+    def which(self, path, opt):
+        """
+        Return the name of the layer that provides the value of an option, or
+        None if no layer has it.
+
+        :param tuple path: The path of the section.
+        :param str opt: The name of the option.
+        """
+        found = self._lookup(path, opt)
+        return None if found is None else found[0]
+
+    def has_section(self, path):
+        """
+        Return True if any layer has a section.
+
+        :param tuple path: The path of the section.
+        """
+        return any(layer.has_section(path) for name, layer in
+                   self._get_order())
+
+    def set(self, path, opt, value):
+        """
+        Set the value of an option in the top layer, creating its section if
+        it does not exist; the lower layers are not changed.
+
+        The top layer is rebuilt, so the time taken is proportional to its
+        size: keep the options that change often in a small layer pushed on
+        top of the others.
+
+        :param tuple path: The path of the section.
+        :param str opt: The name of the option.
+        :param str value: The new value of the option.
+        """
+        if not self._layers:
+            raise ValueError('The overlay has no layers')
+
+        name = next(reversed(self._layers))
+        conf = ConfigFile(self._layers[name].get_tree(), **self._kwargs)
+        cobj = ({opt: value}, {})
+
+        for sec in reversed(tuple(path)):
+            cobj = ({}, {sec: cobj})
+
+        conf.upgrade(cobj)
+        self._layers[name] = conf.freeze()
+        self._order = None
+
+    def get_tree(self, path=()):
+        """
+        Return a compatible object (see :py:meth:`Section._import_object`)
+        with the options and subsections of a section merged from all the
+        layers in upgrade mode; as with :py:meth:`ConfigSnapshot.get_tree`,
+        inherited options are not included.
+
+        :param tuple path: The path of the section.
+        """
+        path = tuple(path)
+        trees = [layer.get_tree(path) for layer in self._layers.values()
+                 if layer.has_section(path)]
+
+        if not trees:
+            raise KeyError('Section not found: {}'.format(path))
+
+        return ConfigFile(*trees, **self._kwargs).get_tree()
+
+    def materialize(self):
+        """
+        Return a new :py:class:`ConfigFile` object with the layers merged in
+        upgrade mode; use :py:meth:`Section.freeze` on it to obtain a compact
+        snapshot.
+        """
+        return ConfigFile(*[layer.get_tree() for layer in
+                            self._layers.values()],
+                          inherit_options=self._inherit_options,
+                          **self._kwargs)
+
+
+def iterparse(source, **kwargs):
+    """
+    Parse a configuration file with the same grammar as
+    :py:class:`ConfigFile`, generating a :py:class:`ParseEvent` for each
+    section line, option line and (optionally) comment line, in order.
+
+    No object is built: only the current line is kept in memory, so this is
+    suitable for single-pass processing of very large files, for example
+    linting or collecting statistics. Section and option names are not
+    validated, and repeated sections and options are reported every time.
+    :py:exc:`ParsingError` is raised when an invalid line is reached.
+
+    :param source: A file name or a readable text stream.
+    :param bool comments: If True (default), comment lines are reported too.
+    :param bool subsections: If True (default), section names are split into
+        paths of subsection names.
+    :param str encoding: The encoding of the file, if source is a file name;
+        see :py:class:`ConfigFile`.
+    """
+    # Necessary for Python 2 compatibility
+    # The Python 3 definition was:
+    #def iterparse(source, comments=True, subsections=True, encoding=None):
+    comments = kwargs.get('comments', True)
+    subsections = kwargs.get('subsections', True)
+    encoding = kwargs.get('encoding')
+
+    parser = ConfigFile(subsections=subsections, encoding=encoding,
+                        path_cache_size=0)
+
+    stream = None
+
+    if not isinstance(source, str):
+        tokens = parser._tokenize(source, comments=comments)
+    else:
+        stream = parser._open_file(source)
+        tokens = parser._tokenize(stream, comments=comments)
+
+    path = ()
+
+    try:
+        for lno, section, key, value in tokens:
+            if section is not None:
+                path = tuple(parser._parse_subsections(section))
+                yield ParseEvent('section', lno + 1, path, None, None)
+            elif key is not None:
+                yield ParseEvent('option', lno + 1, path, key, value)
+            else:
+                yield ParseEvent('comment', lno + 1, path, None, value)
+    finally:
+        # Close the files opened here, also if the generator is not exhausted
+        tokens.close()
+
+        if stream is not None:
+            stream.close()
+
+
+class ParseEvent(collections.namedtuple('ParseEvent', ('event', 'lineno',
+                'path', 'key', 'value'))):
+    """
+    An event generated by :py:func:`iterparse`.
+
+    ``event`` is ``'section'``, ``'option'`` or ``'comment'``, and ``lineno``
+    is the 1-based line number; ``path`` is the tuple of the names of the
+    section, or of the section that contains the option or the comment (empty
+    for the root section); for options ``key`` and ``value`` are the name
+    and the value, for comments ``value`` is the text of the comment, and the
+    other fields are None.
+    """
+    __slots__ = ()
+
+
+class Changeset(collections.namedtuple('Changeset', ('added_sections',
+                'removed_sections', 'added_options', 'changed_options',
+                'removed_options'))):
+    """
+    The differences between two sections, returned by :py:meth:`Section.diff`.
+
+    Paths are tuples of section names relative to the compared sections;
+    ``added_sections`` and ``removed_sections`` are lists of paths (the
+    descendants of a removed section are not listed), ``added_options`` and
+    ``changed_options`` are lists of ``(path, option, new_value)`` tuples, and
+    ``removed_options`` is a list of ``(path, option)`` tuples.
+    """
+    __slots__ = ()
+
+
+class _Settings(collections.namedtuple('_Settings', ('safe_calls',
+                'inherit_options', 'subsections', 'ignore_case', 're_i',
+                'section'))):
+    """
+    The immutable settings shared by all the sections of a tree (see
+    :py:class:`Section` for the meaning of the parameters).
+
+    ``re_i`` and ``section`` are derived from the other settings: they are
+    respectively the flags for regular expressions and the pattern that
+    validates section names.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, safe_calls, inherit_options, subsections, ignore_case):
+        """
+        Return the settings, deriving ``re_i`` and ``section`` from the other
+        ones.
+        """
+        return cls(safe_calls, inherit_options, subsections, ignore_case,
+                   re_.I if ignore_case else 0,
+                   Section._SECTION_SUB if subsections else
+                   Section._SECTION_PLAIN)
+
+
+class _InheritedOptions(object):
+    """
+    A read-only view of the options of a section merged with those inherited
+    from its ancestors, used when options are read with inheritance.
+
+    A view only indexes the options of its own section and refers to the view
+    of the parent section, where the lookups that miss continue, so the memory
+    taken by the views does not grow with the number of inherited options;
+    views are discarded by :py:meth:`Section._invalidate_inherited` when the
+    options of the section or of any of its ancestors change.
+    """
+    def __init__(self, section, parent_view):
+        """
+        Constructor.
+
+        :param Section section: The section.
+        :param parent_view: The view of the parent section, or None for the
+            root section.
+        :type parent_view: _InheritedOptions or None
+        """
+        self._section = section
+        self._parent_view = parent_view
+
+        # Map the (lowercased if ignoring case) option names of the section
+        #  to their values; the options are not modified without discarding
+        #  the view, so they can be used directly
+        if section._SETTINGS.ignore_case:
+            self.index = dict((opt.lower(), val) for opt, val in
+                              section._options.items())
+        else:
+            self.index = section._options
+
+        self._ordered = None
+
+        # The cache of converted values, see Section._get_converted
+        self.values = {}
+
+    def get(self, opt, fallback=None):
+        """
+        Return the value of the closest option with the given (lowercased if
+        ignoring case) name, or fallback.
+        """
+        view = self
+
+        while view is not None:
+            try:
+                return view.index[opt]
+            except KeyError:
+                view = view._parent_view
+
+        return fallback
+
+    def get_index(self):
+        """
+        Return a new dictionary that maps the (lowercased if ignoring case)
+        names of all the options visible from the section to the values of
+        the closest ones.
+        """
+        views = []
+        view = self
+
+        while view is not None:
+            views.append(view)
+            view = view._parent_view
+
+        index = {}
+
+        for view in reversed(views):
+            index.update(view.index)
+
+        return index
+
+    def get_ordered(self):
+        """
+        Return an ordered dictionary with the options of the section followed
+        by the options of its ancestors not overridden with the same name, as
+        :py:meth:`Section.get_options` does.
+        """
+        if self._ordered is None:
+            ordered = self._section._DICT_CLASS(self._section._options)
+
+            if self._parent_view is not None:
+                for opt, val in self._parent_view.get_ordered().items():
+                    ordered.setdefault(opt, val)
+
+            self._ordered = ordered
+
+        return self._ordered
+
+
+class _Interpolator(object):
+    """
+    The engine of :py:meth:`Section._interpolate`.
+
+    The options of a section and of its descendants are the nodes of a graph
+    whose edges are the references among them: each option is resolved after
+    the options it refers to (i.e. in topological order) and only once.
+    """
+    def __init__(self, section):
+        """
+        Constructor.
+
+        :param Section section: The section whose options, and those of its
+            descendants, are to be interpolated.
+        """
+        # The sections whose options are interpolated, in tree order
+        self.sections = [section] + section._get_descendants()
+        self.scope = set(self.sections)
+        # Map the nodes, i.e. (section, option name) tuples, to their
+        #  templates
+        self.templates = {}
+        # Map the nodes to the nodes of the options they refer to, or to
+        #  their values if they are outside the scope
+        self.targets = {}
+        # Map the nodes to their interpolated values
+        self.values = {}
+
+    def interpolate(self):
+        """
+        Interpolate all the options in the scope and store the new values.
+        """
+        nodes = [(section, opt) for section in self.sections
+                 for opt in section._options]
+
+        for node in nodes:
+            self.resolve(node)
+
+        for section, opt in nodes:
+            section._store_option(opt, self.values[(section, opt)])
+
+    def get_template(self, node):
+        """
+        Return the template of a node, compiling it if needed.
+        """
+        template = self.templates.get(node)
+
+        if template is None:
+            section, opt = node
+            template = section._compile_template(section._options[opt])
+            self.templates[node] = template
+
+        return template
+
+    def get_targets(self, node):
+        """
+        Return a list with the targets of the references of a node, in the
+        order of the template: a target is either a node in the scope or a
+        value.
+        """
+        targets = self.targets.get(node)
+
+        if targets is None:
+            targets = [self.find_target(node, part) for part in
+                       self.get_template(node) if isinstance(part, tuple)]
+            self.targets[node] = targets
+
+        return targets
+
+    def find_target(self, node, reference):
+        """
+        Return the target of a reference, see :py:meth:`get_targets`.
+        """
+        section = node[0]
+        relative, path, opt = reference
+        target = section if relative else section._ROOT
+
+        for name in path:
+            subsection = target._find_subsection(name)
+
+            if subsection is None:
+                raise InterpolationError('Section not found: {} (referenced '
+                                         'by {})'.format(name,
+                                                         self.format(node)))
+
+            target = subsection
+
+        # Search the ancestors too if the configuration inherits options, as
+        #  Section.get does
+        if section._SETTINGS.inherit_options:
+            slist = [target] + target._get_ancestors()
+        else:
+            slist = [target]
+
+        for target in slist:
+            o = target._find_option(opt)
+
+            if o is not None:
+                if self.in_scope(target):
+                    return (target, o)
+
+                return target._options[o]
+
+        raise InterpolationError('Option not found: {} (referenced by {})'
+                                 ''.format(opt, self.format(node)))
+
+    def in_scope(self, section):
+        """
+        Return True if the options of a section are interpolated.
+        """
+        return section in self.scope
+
+    def resolve(self, node):
+        """
+        Return the interpolated value of a node, resolving first all the
+        nodes it depends on.
+        """
+        if node in self.values:
+            return self.values[node]
+
+        # Use an explicit stack instead of recursion, so that long chains of
+        #  references do not hit the recursion limit; each frame holds a node
+        #  and the index of the next target to be checked
+        stack = [[node, 0]]
+        visiting = set([node])
+
+        while stack:
+            frame = stack[-1]
+            current, index = frame
+            targets = self.get_targets(current)
+
+            while index < len(targets):
+                target = targets[index]
+                index += 1
+
+                if isinstance(target, tuple) and target not in self.values:
+                    if target in visiting:
+                        nodes = [frame[0] for frame in stack]
+                        cycle = nodes[nodes.index(target):] + [target]
+                        raise InterpolationError('Circular reference: {}'
+                                    ''.format(' -> '.join(self.format(node)
+                                                          for node in cycle)))
+
+                    frame[1] = index
+                    stack.append([target, 0])
+                    visiting.add(target)
+                    break
+            else:
+                self.values[current] = self.render(current)
+                visiting.discard(current)
+                stack.pop()
+
+        return self.values[node]
+
+    def render(self, node):
+        """
+        Return the interpolated value of a node whose targets are all
+        resolved.
+        """
+        targets = iter(self.get_targets(node))
+        chunks = []
+
+        for part in self.get_template(node):
+            if isinstance(part, tuple):
+                target = next(targets)
+
+                if isinstance(target, tuple):
+                    target = self.values[target]
+
+                chunks.append(target)
+            else:
+                chunks.append(part)
+
+        return ''.join(chunks)
+
+    @staticmethod
+    def format(node):
+        """
+        Return a node in the interpolation syntax, for error messages.
+        """
+        section, opt = node
+        names = [s._NAME for s in reversed(section._get_ancestors()[:-1])]
+
+        if section._PARENT is not None:
+            names.append(section._NAME)
+
+        names.append(opt)
+        return ''.join((Section._INTERPOLATION_START,
+                        Section._INTERPOLATION_SEP.join(names),
+                        Section._INTERPOLATION_END))
+
+
+class _LiveInterpolator(_Interpolator):
+    """
+    The engine of live interpolation (see :py:class:`ConfigFile`).
+
+    Option values are stored as they are written, and interpolated only when
+    they are read; interpolated values are cached until an option they depend
+    on, directly or transitively, is changed.
+    """
+    def __init__(self, root):
+        """
+        Constructor.
+
+        :param Section root: The root section of the tree.
+        """
+        self.root = root
+        self.clear()
+
+    def clear(self):
+        """
+        Discard all the cached data, for example when the structure of the
+        tree changes.
+        """
+        self.templates = {}
+        self.targets = {}
+        self.values = {}
+        # Map the nodes to the sets of the nodes whose references resolve to
+        #  them
+        self.dependents = {}
+        # Map the (lowercased if ignoring case) names of referenced options
+        #  to dictionaries that map the sections where the lookups start to
+        #  the sets of the referring nodes: the lookups may resolve to
+        #  different options if an option with that name is created or
+        #  deleted in those sections or, if inheriting, in their ancestors
+        self.lookups = {}
+
+    def in_scope(self, section):
+        return True
+
+    def get(self, section, opt, fallback, inherit_options):
+        """
+        Return the interpolated value of an option, as :py:meth:`Section.get`
+        does.
+        """
+        slist = [section]
+
+        if inherit_options:
+            slist.extend(section._get_ancestors())
+
+        for s in slist:
+            o = s._find_option(opt)
+
+            if o is not None:
+                return self.resolve((s, o))
+
+        return fallback
+
+    def get_targets(self, node):
+        targets = self.targets.get(node)
+
+        if targets is None:
+            targets = _Interpolator.get_targets(self, node)
+
+            for target in targets:
+                if isinstance(target, tuple):
+                    self.dependents.setdefault(target, set()).add(node)
+
+        return targets
+
+    def find_target(self, node, reference):
+        section = node[0]
+        relative, path, opt = reference
+        target = section if relative else section._ROOT
+
+        for name in path:
+            target = target._find_subsection(name)
+
+            if target is None:
+                break
+        else:
+            lopt = opt.lower() if section._SETTINGS.ignore_case else opt
+            self.lookups.setdefault(lopt, {}).setdefault(target,
+                                                         set()).add(node)
+
+        return _Interpolator.find_target(self, node, reference)
+
+    def option_changed(self, section, opt):
+        """
+        Discard the cached data that depend on an option that has been
+        created, changed or deleted.
+
+        :param Section section: The section of the option.
+        :param str opt: The name under which the option is stored.
+        """
+        node = (section, opt)
+        self.templates.pop(node, None)
+        self.targets.pop(node, None)
+        stale = [node]
+        lopt = opt.lower() if section._SETTINGS.ignore_case else opt
+
+        # The lookups of the option name from this section, or, if
+        #  inheriting, from its descendants, may now resolve differently;
+        #  the sections met while walking up from the lookup starts are
+        #  remembered, so that every section is visited at most once
+        inside = set((section, ))
+        outside = set()
+
+        for start, nodes in self.lookups.get(lopt, {}).items():
+            if start is not section:
+                if not section._SETTINGS.inherit_options:
+                    continue
+
+                path = []
+                current = start
+
+                while current is not None and current not in inside and \
+                        current not in outside:
+                    path.append(current)
+                    current = current._PARENT
+
+                if current is None or current in outside:
+                    outside.update(path)
+                    continue
+
+                inside.update(path)
+
+            for referrer in nodes:
+                self.targets.pop(referrer, None)
+                stale.append(referrer)
+
+        # Discard the values of the stale nodes and of their dependents,
+        #  transitively; the targets of the dependents are discarded too, so
+        #  that they register their dependencies again when re-resolved
+        while stale:
+            node = stale.pop()
+            self.values.pop(node, None)
+
+            for dependent in self.dependents.pop(node, ()):
+                self.targets.pop(dependent, None)
+                stale.append(dependent)
+
+
+def _encode_text(text):
+    """
+    Return the UTF-8 encoding of a string, leaving unchanged the byte strings
+    that in Python 2 are already encoded, and would be decoded as ASCII by
+    ``encode``.
+    """
+    if isinstance(text, bytes):
+        return text
+
+    return text.encode('utf-8', 'surrogatepass')
+
+
+# os.replace is not available in Python 2, where os.rename cannot overwrite
+#  existing files on Windows
+_replace_file = getattr(os, 'replace', os.rename)
+
+
+PathCacheInfo = collections.namedtuple('PathCacheInfo', ('hits', 'misses',
+                                       'maxsize', 'currsize', 'generation'))
+
+
+class _PathCache(object):
+    """
+    A thread-safe, least-recently-used cache of resolved section paths, used
+    by :py:meth:`Section.__call__`.
+
+    :py:meth:`invalidate` is called whenever the structure of the tree
+    changes: it discards all the entries, so that they do not keep removed
+    sections alive, and increments the generation. Every entry records the
+    generation in which it was stored, so an entry stored after the
+    invalidation by a lookup that started before it is stale too.
+    """
+    def __init__(self, maxsize):
+        """
+        Constructor.
+
+        :param int maxsize: The maximum number of entries.
+        """
+        self.maxsize = maxsize
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        # Lookups reorder the entries, so concurrent readers of the tree
+        #  would corrupt them
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the section cached for the key, or None.
+        """
+        with self._lock:
+            try:
+                generation, section = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+
+            if generation != self.generation:
+                self.misses += 1
+                return None
+
+            # Move the entry to the most-recently-used end
+            self._entries[key] = (generation, section)
+            self.hits += 1
+            return section
+
+    def set(self, key, section):
+        """
+        Cache a section for the key.
+        """
+        with self._lock:
+            self._entries[key] = (self.generation, section)
+
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """
+        Discard all the cached entries.
+        """
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def info(self):
+        """
+        Return a :py:class:`PathCacheInfo` named tuple.
+        """
+        with self._lock:
+            return PathCacheInfo(self.hits, self.misses, self.maxsize,
+                                 len(self._entries), self.generation)
+
+    def __reduce__(self):
+        """
+        Copy or pickle the cache as a new empty cache with the same size.
+        """
+        return (_PathCache, (self.maxsize, ))
+
+
+class _LazySection(Section):
+    """
+    A section of a lazily-loaded :py:class:`ConfigFile` object that has not
+    been accessed yet (see its ``lazy`` parameter).
+
+    Its options and subsections are not stored: accessing (or setting) any of
+    them loads them with :py:meth:`_LazyIndex.load` and turns the object into
+    a regular :py:class:`Section`, in place. Sections are loaded holding the
+    lock of the index, so that concurrent readers never see a partially
+    loaded section.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, name, parent):
+        """
+        Create a lazy section, without allocating its options and subsections.
+
+        :param str name: The name of the section.
+        :param Section parent: The parent section.
+        """
+        section = cls.__new__(cls)
+        section._NAME = name
+        section._PARENT = parent
+        section._ROOT = parent._ROOT
+        section._SETTINGS = parent._SETTINGS
+        section._shared = False
+        section._inherited = None
+        section._values = None
+        section._fingerprint = None
+        return section
+
+    def _materialize(self):
+        """
+        Load the options and subsections of the section and turn the object
+        into a regular :py:class:`Section`.
+        """
+        lazy = self._ROOT._lazy
+
+        if lazy is None:
+            # All the sections have been loaded by load_all in the meantime
+            return
+
+        with lazy.lock:
+            # The section may have been loaded by another thread, or it may
+            #  be accessed by the importing methods while it is being loaded
+            if self.__class__ is not _LazySection or \
+                                                    id(self) in lazy.loading:
+                return
+
+            ignore_case = self._SETTINGS.ignore_case
+
+            # Set the slots of Section, which the properties below shadow
+            for attr, value in (('_options', self._DICT_CLASS()),
+                                ('_options_index',
+                                 {} if ignore_case else None),
+                                ('_subsections', self._DICT_CLASS()),
+                                ('_subsections_index',
+                                 {} if ignore_case else None)):
+                getattr(Section, attr).__set__(self, value)
+
+            lazy.loading.add(id(self))
+
+            try:
+                lazy.load(self)
+            finally:
+                lazy.loading.discard(id(self))
+                self.__class__ = Section
+
+    def _lazy_attribute(attr):
+        """
+        Return a property that materializes the section when the attribute is
+        accessed.
+        """
+        slot = getattr(Section, attr)
+
+        def get(self):
+            self._materialize()
+            return slot.__get__(self, Section)
+
+        def set_(self, value):
+            self._materialize()
+            slot.__set__(self, value)
+
+        return property(get, set_)
+
+    _options = _lazy_attribute('_options')
+    _options_index = _lazy_attribute('_options_index')
+    _subsections = _lazy_attribute('_subsections')
+    _subsections_index = _lazy_attribute('_subsections_index')
+    del _lazy_attribute
+
+
+class _LazyIndex(object):
+    """
+    The index of the sections of a lazily-loaded file, used by
+    :py:class:`_LazySection`.
+    """
+    def __init__(self, root, cfile):
+        """
+        Constructor.
+
+        Map the file and find its section lines, validating the section names.
+
+        :param ConfigFile root: The root section.
+        :param str cfile: The name of the file.
+        """
+        self.root = root
+        self.name = cfile
+        # Map the normalized paths of the sections (see
+        #  Section._normalize_path) to lists of the (start, end, lno) tuples of
+        #  the ranges of the file with their options
+        self.ranges = {}
+        # Map the normalized paths of the sections to lists of the names of
+        #  their subsections
+        self.children = {}
+        # Serialize the loading of the sections (see _LazySection); the
+        #  importing methods may access other lazy sections while loading
+        self.lock = threading.RLock()
+        # The IDs of the sections being loaded
+        self.loading = set()
+        # Decode the file as Section._open_file would
+        self.encoding = root._get_file_encoding()
+
+        if self.encoding is not None and \
+                u'\n\r\t #;=[]'.encode(self.encoding) != b'\n\r\t #;=[]':
+            # The section lines are searched in the raw bytes
+            raise ValueError('Lazy loading requires an ASCII-compatible '
+                             'encoding: {}'.format(self.encoding))
+
+        with root._open_file(cfile, binary=True) as stream:
+            if os.fstat(stream.fileno()).st_size == 0:
+                # Empty files cannot be mapped
+                self.data = b''
+            else:
+                # The map remains valid after the file is closed
+                self.data = mmap_.mmap(stream.fileno(), 0,
+                                       access=mmap_.ACCESS_READ)
+
+        self._index()
+
+    def _index(self):
+        """
+        Auxiliary method for the constructor.
+        """
+        root = self.root
+        data = self.data
+        settings = root._SETTINGS
+        match = re_.compile(root._PARSE_LINE).match
+        match_section = re_.compile(settings.section, settings.re_i).match
+        # Only the lines that contain "[" can be sections: they are decoded
+        #  and matched like all the others, so that blank characters are
+        #  recognized as in the text files; lines are separated as in text
+        #  files read with universal newlines, except in Python 2 if no
+        #  encoding is set, where the builtin open function does not use them
+        universal = self.encoding is not None
+
+        if not universal:
+            candidates = br'^[^\n\[]*\['
+            line_end = re_.compile(br'\n')
+        # Lines separated by single "\r" characters are rare, and looking
+        #  behind every character for them would slow the search down
+        elif re_.search(br'\r(?!\n)', data):
+            candidates = br'(?:^|(?<=\r))[^\r\n\[]*\['
+            line_end = re_.compile(br'\r\n?|\n')
+        else:
+            candidates = br'^[^\r\n\[]*\['
+            line_end = re_.compile(br'\r?\n')
+
+        candidates = re_.compile(candidates, re_.M)
+        key = ()
+        start = 0
+        lno = 0
+        last = 0
+        self.ranges[key] = []
+
+        for candidate in candidates.finditer(data):
+            pos = candidate.start()
+            found = line_end.search(data, pos)
+
+            if found is None:
+                end = next_ = len(data)
+            else:
+                end, next_ = found.span()
+
+            re_line = match(self._decode(data[pos:end]))
+
+            # For example "[a=b]" is an option
+            if re_line is None or re_line.lastgroup != 'section':
+                continue
+
+            self.ranges[key].append((start, pos, lno))
+            # Memory maps do not have a count method
+            lines = data[last:next_]
+            lno += lines.count(b'\n')
+
+            if universal:
+                lno += lines.count(b'\r') - lines.count(b'\r\n')
+            last = next_
+            key = ()
+
+            for name in root._parse_subsections(re_line.group('section')):
+                if not match_section(name):
+                    raise InvalidObjectError('Invalid section name: {}'
+                                                            ''.format(name))
+
+                parent = key
+                key += (name.lower() if settings.ignore_case else name, )
+
+                if key not in self.ranges:
+                    self.ranges[key] = []
+                    self.children.setdefault(parent, []).append(name)
+
+            start = next_
+
+        self.ranges[key].append((start, len(data), lno))
+
+    def load(self, section):
+        """
+        Create the subsections of a section, as lazy sections, and import its
+        options.
+
+        :param Section section: The section, which must be empty.
+        """
+        names = []
+        ancestor = section
+
+        while ancestor._PARENT is not None:
+            names.append(ancestor._NAME)
+            ancestor = ancestor._PARENT
+
+        names.reverse()
+        key = section._normalize_path(names)
+        ignore_case = section._SETTINGS.ignore_case
+
+        for name in self.children.pop(key, ()):
+            section._subsections[name] = _LazySection.create(name, section)
+
+            if ignore_case:
+                section._subsections_index[name.lower()] = name
+
+        section._import_tokens(token for start, end, lno in
+                               self.ranges.pop(key, ()) for token in
+                               section._tokenize(self._open_range(start, end),
+                                                 lno=lno))
+
+    def _decode(self, data):
+        """
+        Decode bytes of the file, unless they are read as bytes (in Python 2,
+        if no encoding is set).
+        """
+        if self.encoding is None:
+            return data
+
+        return data.decode(self.encoding)
+
+    def _open_range(self, start, end):
+        """
+        Return a text stream with a range of the file, decoded and with the
+        line separators translated as :py:meth:`Section._open_file` would.
+        """
+        if self.encoding is None:
+            stream = io.BytesIO(self.data[start:end])
+        else:
+            stream = io.StringIO(self._decode(self.data[start:end]),
+                                 newline=None)
+
+        stream.name = self.name
+        return stream
+
+    def release(self, cfile):
+        """
+        If the given file is the lazily-loaded one, load all the sections that
+        have not been accessed yet and unmap the file, so that it can be
+        overwritten.
+
+        :param str cfile: The name of the file.
+        """
+        try:
+            if not os.path.samefile(cfile, self.name):
+                return
+        except OSError:
+            return
+
+        self.load_all()
+
+    def load_all(self):
+        """
+        Load all the sections that have not been accessed yet, unmap the file
+        and detach the index from the root section.
+        """
+        with self.lock:
+            stack = [self.root]
+
+            while stack:
+                section = stack.pop()
+                # This also materializes the lazy sections
+                stack.extend(section._subsections.values())
+
+            if not isinstance(self.data, bytes):
+                self.data.close()
+
+            self.data = b''
+            self.root._lazy = None
+
+
+ParseCacheInfo = collections.namedtuple('ParseCacheInfo', ('hits', 'misses',
+                            'evictions', 'maxsize', 'currsize', 'maxbytes',
+                            'currbytes'))
+
+
+class ParseCache(object):
+    """
+    A thread-safe, least-recently-used cache of the tokens parsed from
+    configuration files, shared by the :py:class:`ConfigFile` objects created
+    with the ``parse_cache`` argument.
+
+    The cost of each entry is the size of its file in bytes; the
+    least-recently-used entries are evicted when either the number of entries
+    or their total size exceeds the limit.
+    """
+    def __init__(self, maxsize=128, maxbytes=64 * 1024 * 1024):
+        """
+        Constructor.
+
+        :param int maxsize: The maximum number of entries.
+        :param int maxbytes: The maximum total size of the cached files;
+            larger files are never cached.
+        """
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._currbytes = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the tokens cached for the key, or None.
+        """
+        with self._lock:
+            try:
+                entry = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+
+            # Move the entry to the most-recently-used end
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, tokens, size):
+        """
+        Cache the tokens parsed from a file for the key.
+
+        :param int size: The size of the file in bytes.
+        """
+        if size > self.maxbytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+
+            if old is not None:
+                self._currbytes -= old[1]
+
+            self._entries[key] = (tokens, size)
+            self._currbytes += size
+
+            while len(self._entries) > self.maxsize or \
+                                            self._currbytes > self.maxbytes:
+                self._currbytes -= self._entries.popitem(last=False)[1][1]
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Discard all the entries, keeping the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._currbytes = 0
+
+    def info(self):
+        """
+        Return a :py:class:`ParseCacheInfo` named tuple with the statistics of
+        the cache.
+        """
+        with self._lock:
+            return ParseCacheInfo(self.hits, self.misses, self.evictions,
+                                  self.maxsize, len(self._entries),
+                                  self.maxbytes, self._currbytes)
+
+    def __reduce__(self):
+        """
+        Support pickling the objects that use the cache: the process-wide
+        :py:data:`PARSE_CACHE` is restored as the one of the unpickling
+        process, other caches as new empty caches with the same limits.
+        """
+        if self is PARSE_CACHE:
+            return 'PARSE_CACHE'
+
+        return (ParseCache, (self.maxsize, self.maxbytes))
+
+    def __deepcopy__(self, memo):
+        """
+        Keep sharing the cache with the copies of the objects that use it.
+        """
+        return self
+
+
+# The cache used by the ConfigFile objects created with parse_cache=True
+PARSE_CACHE = ParseCache()
 
 
 ### EXCEPTIONS ###
@@ -1615,3 +4433,11 @@ class InvalidObjectError(ConfigFileError):
     An invalid key found in an importing object.
     """
     pass
+
+
+class InterpolationError(ConfigFileError):
+    """
+    A reference to a non-existent section or option, or a circular reference,
+    found while interpolating values.
+    """
+    pass
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+"""
+Measure how the time taken by :py:meth:`configfile.Section.export_upgrade`
+grows with the number of sections, merging with a target file that already
+contains half of them (with outdated values) in reverse order.
+
+The time per section should stay roughly constant as the tree grows.
+
+Usage::
+
+    python dev/benchmarks/export.py [sections] [options_per_section]
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..', '..')))
+
+from configfile import ConfigFile  # noqa: E402
+
+
+def make_tree(sections, options):
+    tree = ({}, {})
+
+    for snum in range(sections):
+        group = tree[1].setdefault('Group{}'.format(snum // 10), ({}, {}))
+        group[1]['Section{}'.format(snum)] = (
+            dict(('option{}'.format(onum), 'value{}'.format(onum))
+                 for onum in range(options)), {})
+
+    return tree
+
+
+def make_target(sections, options):
+    lines = []
+
+    for snum in reversed(range(0, sections, 2)):
+        lines.append('[Group{}.Section{}]'.format(snum // 10, snum))
+        lines.append('# A comment for section {}'.format(snum))
+
+        for onum in range(options):
+            lines.append('option{} = old value'.format(onum))
+
+        lines.append('')
+
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    sections = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    options = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    directory = tempfile.mkdtemp()
+    target = os.path.join(directory, 'target.conf')
+
+    try:
+        for size in (sections // 4, sections // 2, sections):
+            conf = ConfigFile(make_tree(size, options))
+            text = make_target(size, options)
+
+            def setup():
+                with open(target, 'w') as stream:
+                    stream.write(text)
+
+            best = min(timeit.repeat(lambda: conf.export_upgrade(target),
+                                     setup=setup, number=1, repeat=3))
+            print('{:>8,} sections {:>8.3f} s {:>8.2f} us/section'.format(
+                  size, best, best / size * 1e6))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
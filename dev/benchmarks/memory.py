@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+"""
+Measure with tracemalloc the memory taken by a
+:py:class:`configfile.ConfigFile` object per section.
+
+Usage::
+
+    python dev/benchmarks/memory.py [sections] [options_per_section]
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..', '..')))
+
+from configfile import ConfigFile  # noqa: E402
+
+
+def make_tree(sections, options):
+    tree = ({}, {})
+
+    for snum in range(sections):
+        group = tree[1].setdefault('Group{}'.format(snum // 100), ({}, {}))
+        group[1]['Section{}'.format(snum)] = (
+            dict(('option{}'.format(onum), 'value{}'.format(onum))
+                 for onum in range(options)), {})
+
+    return tree
+
+
+def measure(tree, sections, **kwargs):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    conf = ConfigFile(tree, **kwargs)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Keep the object alive until after the measurement
+    del conf
+    return (after - before) / float(sections)
+
+
+def main():
+    sections = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    options = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    tree = make_tree(sections, options)
+    # Count the group sections too
+    total = sections + (sections + 99) // 100
+
+    for ignore_case in (True, False):
+        print('ignore_case={!s:5} {:>8,.0f} bytes/section ({} sections, {} '
+              'options each)'.format(ignore_case,
+                                     measure(tree, total,
+                                             ignore_case=ignore_case),
+                                     total, options))
+
+
+if __name__ == '__main__':
+    main()
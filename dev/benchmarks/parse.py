@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+"""
+Compare the speed of :py:meth:`configfile.Section._parse_file` with the
+original parser, which matched every line against the separate
+``_PARSE_*`` patterns one after the other, and check that both produce the
+same tree.
+
+Usage::
+
+    python dev/benchmarks/parse.py [sections] [options_per_section]
+"""
+
+import io
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..', '..')))
+
+from configfile import Section  # noqa: E402
+
+
+def legacy_parse_file(section, stream):
+    """
+    The original implementation of ``Section._parse_file``.
+    """
+    with stream:
+        cdict = section._EMPTY_SECTION()
+        lastsect = cdict
+
+        for lno, line in enumerate(stream):
+            if re.match(section._PARSE_IGNORE, line, section._SETTINGS.re_i):
+                continue
+
+            if re.match(section._PARSE_COMMENT, line, section._SETTINGS.re_i):
+                continue
+
+            re_option = re.match(section._PARSE_OPTION, line,
+                                 section._SETTINGS.re_i)
+
+            if re_option:
+                lastsect[0][re_option.group(1)] = re_option.group(2)
+                continue
+
+            re_section = re.match(section._PARSE_SECTION, line,
+                                  section._SETTINGS.re_i)
+            if re_section:
+                d = cdict
+
+                for s in section._parse_subsections(re_section.group(1)):
+                    if s not in d[1]:
+                        d[1][s] = section._EMPTY_SECTION()
+
+                    d = d[1][s]
+
+                lastsect = d
+                continue
+
+            raise ValueError('Invalid line {}'.format(lno + 1))
+
+    return cdict
+
+
+def make_config(sections, options):
+    lines = ['root_option = root value', '']
+
+    for snum in range(sections):
+        lines.append('[Section{}.Sub{}]'.format(snum // 10, snum % 10))
+        lines.append('# A comment for section {}'.format(snum))
+
+        for onum in range(options):
+            lines.append('  option{} =  value {} of {}  '.format(onum, onum,
+                                                                 snum))
+
+        lines.append('; another comment')
+        lines.append('   ')
+
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    sections = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    options = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    text = make_config(sections, options)
+    nlines = text.count('\n')
+
+    for ignore_case in (True, False):
+        for subsections in (True, False):
+            section = Section(ignore_case=ignore_case,
+                              subsections=subsections)
+
+            legacy = legacy_parse_file(section, io.StringIO(text))
+            current = section._parse_file(io.StringIO(text))
+
+            if legacy != current:
+                sys.exit('Trees differ (ignore_case={}, subsections={})'
+                         ''.format(ignore_case, subsections))
+
+            print('ignore_case={!s:5} subsections={!s:5} trees identical'
+                  ''.format(ignore_case, subsections))
+
+            for name, func in (('legacy', legacy_parse_file),
+                               ('current', Section._parse_file)):
+                best = min(timeit.repeat(
+                    lambda: func(section, io.StringIO(text)),
+                    number=1, repeat=5))
+                print('    {:8} {:>12,.0f} lines/s'.format(name,
+                                                           nlines / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import copy
+import os
+import pickle
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import ConfigFile, ParseCache, PARSE_CACHE  # noqa: E402
+
+
+class NoParseConfigFile(ConfigFile):
+    """
+    Fail if a file has to be parsed, i.e. if it is not found in the caches.
+    """
+    def _tokenize(self, stream, comments=False, lno=0):
+        raise AssertionError('The file was parsed')
+
+
+class CacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'test.conf')
+        self.write('a = 1\n[S]\nb = 2\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, text, mtime=None):
+        with open(self.path, 'w') as stream:
+            stream.write(text)
+
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+
+
+class TestParseCache(CacheTestCase):
+    def setUp(self):
+        CacheTestCase.setUp(self)
+        self.cache = ParseCache()
+
+    def load(self):
+        return ConfigFile(self.path, parse_cache=self.cache).get_tree()
+
+    def test_hit_and_miss(self):
+        tree = self.load()
+        self.assertEqual(self.load(), tree)
+        info = self.cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+
+    def test_size_change(self):
+        self.load()
+        self.write('a = 10\n')
+        self.assertEqual(self.load(), ({'a': '10'}, {}))
+
+    def test_mtime_change(self):
+        self.write('a = 1\n', mtime=1000000000)
+        self.load()
+        self.write('a = 2\n', mtime=1000000100)
+        self.assertEqual(self.load(), ({'a': '2'}, {}))
+        self.assertEqual(self.cache.info().misses, 2)
+
+    def test_copy_and_pickle(self):
+        conf = ConfigFile(self.path, parse_cache=True)
+        self.assertIs(pickle.loads(pickle.dumps(conf, 2))._parse_cache,
+                      PARSE_CACHE)
+        self.assertIs(copy.deepcopy(conf)._parse_cache, PARSE_CACHE)
+
+        conf = ConfigFile(self.path, parse_cache=self.cache)
+        self.assertIs(copy.deepcopy(conf)._parse_cache, self.cache)
+        clone = pickle.loads(pickle.dumps(conf, 2))
+        self.assertEqual(clone._parse_cache.info().maxsize,
+                         self.cache.info().maxsize)
+        self.assertEqual(clone.get_tree(), conf.get_tree())
+
+
+class TestDiskCache(CacheTestCase):
+    def setUp(self):
+        CacheTestCase.setUp(self)
+        self.cache = os.path.join(self.directory, 'cache')
+
+    def entries(self):
+        return [os.path.join(self.cache, name) for name in
+                os.listdir(self.cache)]
+
+    def test_hit(self):
+        tree = ConfigFile(self.path, disk_cache=self.cache).get_tree()
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache).st_mode), 0o700)
+        self.assertEqual(NoParseConfigFile(self.path,
+                                           disk_cache=self.cache).get_tree(),
+                         tree)
+
+    def test_stale_entry(self):
+        ConfigFile(self.path, disk_cache=self.cache)
+        self.write('a = 3\n')
+        self.assertEqual(ConfigFile(self.path,
+                                    disk_cache=self.cache).get_tree(),
+                         ({'a': '3'}, {}))
+
+    def test_corrupt_entry(self):
+        ConfigFile(self.path, disk_cache=self.cache)
+
+        for entry in self.entries():
+            with open(entry, 'wb') as stream:
+                stream.write(b'\x00garbage')
+
+        self.assertEqual(ConfigFile(self.path,
+                                    disk_cache=self.cache).get_tree(),
+                         ({'a': '1'}, {'S': ({'b': '2'}, {})}))
+
+    def test_untrusted_entry(self):
+        ConfigFile(self.path, disk_cache=self.cache)
+
+        for entry in self.entries():
+            os.chmod(entry, 0o666)
+
+        with self.assertRaises(AssertionError):
+            NoParseConfigFile(self.path, disk_cache=self.cache)
+
+    def test_directory_required(self):
+        with self.assertRaises(ValueError):
+            ConfigFile(self.path, disk_cache=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import ConfigFile  # noqa: E402
+
+
+TREE = ({'a': '1'}, {'S': ({'b': '2'}, {'T': ({'c': '3'}, {})})})
+
+
+class TestClone(unittest.TestCase):
+    def test_same_contents(self):
+        conf = ConfigFile(TREE)
+        clone = conf.clone()
+        self.assertEqual(clone.get_tree(), conf.get_tree())
+        self.assertEqual(clone.fingerprint(), conf.fingerprint())
+        self.assertEqual(conf('S').clone().get_tree(), TREE[1]['S'])
+
+    def test_modify_source_after_clone(self):
+        conf = ConfigFile(TREE)
+        clone = conf.clone()
+        conf('S')['b'] = '4'
+        conf('S', 'T').delete()
+        conf['d'] = '5'
+        self.assertEqual(clone.get_tree(), ConfigFile(TREE).get_tree())
+
+    def test_modify_clone(self):
+        conf = ConfigFile(TREE)
+        clone = conf.clone()
+        clone('S', 'T')['c'] = '6'
+        clone.make_subsection('U')
+        self.assertEqual(conf.get_tree(), ConfigFile(TREE).get_tree())
+
+    def test_settings(self):
+        for ignore_case in (True, False):
+            conf = ConfigFile(TREE, ignore_case=ignore_case,
+                              inherit_options=True, safe_calls=True)
+            clone = conf.clone()
+            self.assertEqual(clone._SETTINGS, conf._SETTINGS)
+            self.assertEqual(clone('S', 'T')['a'], '1')
+            self.assertEqual(clone('S', 'X').get_tree(), TREE[1]['S'])
+            clone['A'] = '7'
+            self.assertEqual(len(clone.get_options()), 2 - ignore_case)
+
+        clone = ConfigFile(TREE, ignore_case=False).clone()
+        self.assertIsNone(clone._options_index)
+        self.assertIsNone(clone._subsections_index)
+
+
+if __name__ == '__main__':
+    unittest.main()
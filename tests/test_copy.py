@@ -0,0 +1,40 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import copy
+import os
+import pickle
+import sys
+import unittest
+import weakref
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import ConfigFile  # noqa: E402
+
+
+class TestCopy(unittest.TestCase):
+    def setUp(self):
+        self.conf = ConfigFile(({'a': '1'}, {'S': ({'b': '2'}, {})}),
+                               inherit_options=True)
+
+    def test_deepcopy(self):
+        clone = copy.deepcopy(self.conf)
+        self.assertEqual(clone.get_tree(), self.conf.get_tree())
+        self.assertEqual(clone._SETTINGS, self.conf._SETTINGS)
+        self.assertEqual(clone('S')['a'], '1')
+
+    def test_pickle(self):
+        clone = pickle.loads(pickle.dumps(self.conf, 2))
+        self.assertEqual(clone.get_tree(), self.conf.get_tree())
+        self.assertEqual(clone._SETTINGS, self.conf._SETTINGS)
+
+    def test_weakref(self):
+        self.assertIs(weakref.ref(self.conf)(), self.conf)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import (ConfigFile, Changeset,  # noqa: E402
+                        InvalidObjectError)
+
+
+OLD = ({'a': '1', 'b': '2'},
+       {'S': ({'c': '3'}, {'T': ({'d': '4'}, {})}),
+        'U': ({'e': '5'}, {}),
+        'V': ({'f': '6'}, {})})
+NEW = ({'a': '10', 'g': '7'},
+       {'S': ({'c': '3'}, {'T': ({'d': '4'}, {})}),
+        'U': ({'e': '5', 'h': '8'}, {}),
+        'W': ({'i': '9'}, {'X': ({}, {})})})
+
+
+class TestDiff(unittest.TestCase):
+    def setUp(self):
+        self.old = ConfigFile(OLD)
+        self.new = ConfigFile(NEW)
+
+    def test_changeset(self):
+        changes = self.old.diff(self.new)
+        self.assertEqual(sorted(changes.added_sections), [('W', ),
+                                                          ('W', 'X')])
+        self.assertEqual(changes.removed_sections, [('V', )])
+        self.assertEqual(sorted(changes.added_options),
+                         [((), 'g', '7'), (('U', ), 'h', '8'),
+                          (('W', ), 'i', '9')])
+        self.assertEqual(changes.changed_options, [((), 'a', '10')])
+        self.assertEqual(changes.removed_options, [((), 'b')])
+
+    def test_identical(self):
+        self.assertEqual(self.old.diff(ConfigFile(OLD)),
+                         Changeset([], [], [], [], []))
+
+    def test_round_trip(self):
+        self.old.apply(self.old.diff(self.new))
+        self.assertEqual(self.old.get_tree(ordered=False),
+                         self.new.get_tree(ordered=False))
+
+    def test_update_mode(self):
+        self.old.apply(self.old.diff(self.new), add=False)
+        self.assertEqual(self.old.get_tree(),
+                         ({'a': '10'},
+                          {'S': ({'c': '3'}, {'T': ({'d': '4'}, {})}),
+                           'U': ({'e': '5'}, {})}))
+
+    def test_add_mode(self):
+        self.old.apply(self.old.diff(self.new), overwrite=False)
+        self.assertEqual(self.old.get_tree(),
+                         ({'a': '1', 'b': '2', 'g': '7'},
+                          {'S': ({'c': '3'}, {'T': ({'d': '4'}, {})}),
+                           'U': ({'e': '5', 'h': '8'}, {}),
+                           'V': ({'f': '6'}, {}),
+                           'W': ({'i': '9'}, {'X': ({}, {})})}))
+
+    def test_invalid_changeset(self):
+        changes = Changeset([], [('V', )], [((), 'ok', '1')],
+                            [((), 'a', 'x\ny')], [((), 'b')])
+
+        with self.assertRaises(InvalidObjectError):
+            self.old.apply(changes)
+
+        self.assertEqual(self.old.get_tree(), ConfigFile(OLD).get_tree())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import io
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import ConfigFile  # noqa: E402
+
+
+class ExportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'test.conf')
+        self.conf = ConfigFile(({'a': '1'}, {'S': ({'b': '2'}, {})}))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self):
+        with open(self.path) as stream:
+            return stream.read()
+
+
+class FailingConfigFile(ConfigFile):
+    """
+    Fail while the new contents of a file are being written.
+    """
+    def _export_lines(self, lines, stream, overwrite, add, reset, path):
+        stream.write('partial')
+        raise RuntimeError('Export failed')
+
+
+class TestAtomic(ExportTestCase):
+    def write(self, text):
+        with open(self.path, 'w') as stream:
+            stream.write(text)
+
+    def test_same_result(self):
+        for mode in ('upgrade', 'update', 'add', 'reset'):
+            results = []
+
+            for atomic in (False, True):
+                self.write('# comment\nb = 0\n[S]\nc = 3\n[T]\n')
+                getattr(self.conf, 'export_' + mode)(self.path,
+                                                     atomic=atomic)
+                results.append(self.read())
+
+            self.assertEqual(results[0], results[1], mode)
+
+    def test_replaces_file(self):
+        self.write('a = 0\n')
+        os.chmod(self.path, 0o640)
+        inode = os.stat(self.path).st_ino
+        self.conf.export_upgrade(self.path, atomic=True)
+        st = os.stat(self.path)
+        self.assertNotEqual(st.st_ino, inode)
+        self.assertEqual(stat.S_IMODE(st.st_mode), 0o640)
+        self.assertEqual(self.read(), 'a = 1\n\n[S]\nb = 2\n')
+        self.assertEqual(os.listdir(self.directory), ['test.conf'])
+
+    def test_failure_keeps_target(self):
+        self.write('a = 0\n')
+        conf = FailingConfigFile({'a': '1'})
+
+        with self.assertRaises(RuntimeError):
+            conf.export_upgrade(self.path, atomic=True)
+
+        self.assertEqual(self.read(), 'a = 0\n')
+        self.assertEqual(os.listdir(self.directory), ['test.conf'])
+
+    def test_symlink(self):
+        link = os.path.join(self.directory, 'link.conf')
+        self.write('a = 0\n')
+        os.symlink(self.path, link)
+        self.conf.export_upgrade(link, atomic=True)
+        self.assertTrue(os.path.islink(link))
+        self.assertEqual(self.read(), 'a = 1\n\n[S]\nb = 2\n')
+
+    def test_fsync(self):
+        synced = []
+        fsync = os.fsync
+
+        def fake_fsync(fd):
+            synced.append(fd)
+            fsync(fd)
+
+        os.fsync = fake_fsync
+
+        try:
+            for atomic in (False, True):
+                del synced[:]
+                self.conf.export_upgrade(self.path, atomic=atomic)
+                self.assertEqual(synced, [])
+                self.conf.export_upgrade(self.path, atomic=atomic,
+                                         fsync=True)
+                self.assertTrue(synced)
+        finally:
+            os.fsync = fsync
+
+
+class TestStream(ExportTestCase):
+    def setUp(self):
+        ExportTestCase.setUp(self)
+        self.conf = ConfigFile(({'a': '1'},
+                                {'S': ({'b': '2'}, {'T': ({'c': '3'}, {})}),
+                                 'U': ({}, {'V': ({'d': '4'}, {})})}))
+
+    def exported(self, section=None, **kwargs):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+        (section or self.conf).export_upgrade(self.path, **kwargs)
+        return self.read()
+
+    def test_same_as_file(self):
+        for path in (True, False):
+            text = ''.join(self.conf.iter_export(path=path))
+            self.assertEqual(text, self.exported(path=path))
+
+    def test_subsection(self):
+        section = self.conf('S')
+
+        for path in (True, False):
+            self.assertEqual(''.join(section.iter_export(path=path)),
+                             self.exported(section, path=path))
+
+    def test_chunks(self):
+        chunks = list(self.conf.iter_export())
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(chunks[0], 'a = 1\n')
+        self.assertEqual(list(ConfigFile().iter_export()), [])
+
+    def test_encoding(self):
+        chunks = list(self.conf.iter_export(encoding='utf-8'))
+        self.assertTrue(all(isinstance(chunk, bytes) for chunk in chunks))
+        self.assertEqual(b''.join(chunks).decode('utf-8'),
+                         self.exported())
+
+    def test_binary_stream(self):
+        stream = io.BytesIO()
+        self.conf.export_stream(stream)
+        self.assertEqual(stream.getvalue().decode('utf-8'), self.exported())
+
+    def test_text_stream(self):
+        with open(self.path, 'w') as stream:
+            self.conf.export_stream(stream)
+
+        text = self.read()
+        self.assertEqual(text, self.exported())
+
+
+class TestSkipUnchanged(ExportTestCase):
+    def test_unchanged(self):
+        for atomic in (False, True):
+            self.conf.export_upgrade(self.path, atomic=atomic)
+            os.utime(self.path, (1000000000, 1000000000))
+            inode = os.stat(self.path).st_ino
+            self.conf.export_upgrade(self.path, atomic=atomic,
+                                     skip_unchanged=True)
+            st = os.stat(self.path)
+            self.assertEqual((st.st_ino, st.st_mtime), (inode, 1000000000))
+            os.remove(self.path)
+
+    def test_changed(self):
+        self.conf.export_upgrade(self.path)
+        self.conf['a'] = '3'
+        self.conf.export_upgrade(self.path, skip_unchanged=True)
+        self.assertEqual(self.read(), 'a = 3\n\n[S]\nb = 2\n')
+
+    def test_missing_file(self):
+        self.conf.export_upgrade(self.path, skip_unchanged=True)
+        self.assertEqual(self.read(), 'a = 1\n\n[S]\nb = 2\n')
+
+    # Python 2 only supports str values, written without an encoding
+    @unittest.skipIf(str is bytes, 'Unicode values are not supported')
+    def test_encoding(self):
+        conf = ConfigFile({'a': u'\xe9'}, encoding='latin-1')
+        conf.export_upgrade(self.path)
+
+        with open(self.path, 'rb') as stream:
+            self.assertEqual(stream.read(), b'a = \xe9\n')
+
+        conf.export_upgrade(self.path, skip_unchanged=True)
+
+        with io.open(self.path, encoding='latin-1') as stream:
+            self.assertEqual(stream.read(), u'a = \xe9\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import ConfigFile  # noqa: E402
+
+
+class TestFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.tree = ({'a': '1'}, {'S': ({'b': '2'}, {'T': ({'c': '3'}, {})}),
+                                  'U': ({'d': '4'}, {})})
+        self.conf = ConfigFile(self.tree)
+
+    def test_equal_trees(self):
+        self.assertEqual(self.conf.fingerprint(),
+                         ConfigFile(self.tree).fingerprint())
+        self.assertEqual(self.conf('S').fingerprint(),
+                         ConfigFile(self.tree[1]['S']).fingerprint())
+
+    def test_edit(self):
+        before = self.conf.fingerprint()
+        unchanged = self.conf('U').fingerprint()
+        self.conf('S', 'T')['c'] = '5'
+        self.assertNotEqual(self.conf.fingerprint(), before)
+        self.assertEqual(self.conf('U').fingerprint(), unchanged)
+        self.conf('S', 'T')['c'] = '3'
+        self.assertEqual(self.conf.fingerprint(), before)
+
+    def test_structure_change(self):
+        before = self.conf.fingerprint()
+        self.conf('U').delete()
+        self.assertNotEqual(self.conf.fingerprint(), before)
+
+    def test_names_are_not_ambiguous(self):
+        self.assertNotEqual(ConfigFile({'a': '1b'}).fingerprint(),
+                            ConfigFile({'a1': 'b'}).fingerprint())
+
+    def test_non_ascii(self):
+        text = u'a = \xe8\n'
+        source = io.BytesIO(text.encode('utf-8')) if str is bytes else \
+            io.StringIO(text)
+        conf = ConfigFile(source)
+        before = conf.fingerprint()
+        conf['a'] = '1'
+        self.assertNotEqual(conf.fingerprint(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
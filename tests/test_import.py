@@ -0,0 +1,28 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import ConfigFile, ParsingError  # noqa: E402
+
+
+class TestImport(unittest.TestCase):
+    def test_failed_reset_keeps_data(self):
+        conf = ConfigFile({'keep': 'yes'})
+
+        with self.assertRaises(ParsingError):
+            conf.reset(io.StringIO(u'a = 1\n[S]\nb = 2\ninvalid line\n'))
+
+        self.assertEqual(conf.get_tree(), ({'keep': 'yes'}, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
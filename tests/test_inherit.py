@@ -0,0 +1,52 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import ConfigFile  # noqa: E402
+
+
+class TestInheritedOptions(unittest.TestCase):
+    def setUp(self):
+        self.conf = ConfigFile(({'a': '1', 'b': '1'},
+                                {'S': ({'b': '2'},
+                                       {'T': ({'c': '3'}, {})})}),
+                               inherit_options=True)
+
+    def test_lookup(self):
+        deep = self.conf('S', 'T')
+        self.assertEqual((deep['a'], deep['b'], deep['c']), ('1', '2', '3'))
+        self.assertIsNone(deep.get('d'))
+        self.assertEqual(deep.get_options(),
+                         {'a': '1', 'b': '2', 'c': '3'})
+
+    def test_views_are_not_copied(self):
+        view = self.conf('S', 'T')._get_inherited()
+        self.assertEqual(view.index, {'c': '3'})
+
+    def test_ancestor_change(self):
+        deep = self.conf('S', 'T')
+        self.assertEqual(deep['b'], '2')
+        self.conf('S')['b'] = '4'
+        self.conf['a'] = '5'
+        self.assertEqual((deep['a'], deep['b']), ('5', '4'))
+        del self.conf('S')['b']
+        self.assertEqual(deep['b'], '1')
+
+    def test_ignore_case(self):
+        conf = ConfigFile(({'A': '1'}, {'S': ({'b': '2'}, {})}),
+                          inherit_options=True, ignore_case=True)
+        self.assertEqual(conf('s')['a'], '1')
+        conf['a'] = '3'
+        self.assertEqual(conf('S')['A'], '3')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import ConfigFile  # noqa: E402
+
+
+class CountingConfigFile(ConfigFile):
+    """
+    Count the interpolation passes.
+    """
+    __slots__ = ('passes', )
+
+    def _interpolate(self):
+        self.passes = getattr(self, 'passes', 0) + 1
+        ConfigFile._interpolate(self)
+
+
+SOURCES = (({}, {'H': ({'host': 'example.org'}, {})}),
+           ({}, {'S': ({'url': 'http://${H$:host$}/'}, {})}),
+           ({'port': '80', 'full': '${S$:url$}:${port$}'}, {}))
+
+
+class TestDeferredInterpolation(unittest.TestCase):
+    def test_single_pass(self):
+        conf = CountingConfigFile(*SOURCES, interpolation=True,
+                                  defer_interpolation=True)
+        self.assertEqual(conf.passes, 1)
+        conf = CountingConfigFile(*SOURCES, interpolation=True)
+        self.assertEqual(conf.passes, len(SOURCES))
+
+    def test_same_results(self):
+        eager = ConfigFile(*SOURCES, interpolation=True)
+        deferred = ConfigFile(*SOURCES, interpolation=True,
+                              defer_interpolation=True)
+        self.assertEqual(deferred.get_tree(), eager.get_tree())
+        self.assertEqual(deferred['full'], 'http://example.org/:80')
+
+    def test_import_methods(self):
+        for method in ('upgrade', 'update', 'add'):
+            conf = CountingConfigFile(*SOURCES)
+            getattr(conf, method)(*SOURCES, interpolation=True,
+                                  defer_interpolation=True)
+            self.assertEqual(conf.passes, 1, method)
+
+    def test_final_values(self):
+        sources = ({'a': '1', 'b': '${a$}'}, {'a': '2'})
+        self.assertEqual(ConfigFile(*sources, interpolation=True)['b'], '1')
+        self.assertEqual(ConfigFile(*sources, interpolation=True,
+                                    defer_interpolation=True)['b'], '2')
+
+    def test_disabled_without_interpolation(self):
+        conf = CountingConfigFile(*SOURCES, defer_interpolation=True)
+        self.assertFalse(hasattr(conf, 'passes'))
+        self.assertEqual(conf('S')['url'], 'http://${H$:host$}/')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import (ConfigFile, ParseEvent, ParsingError,  # noqa: E402
+                        iterparse)
+
+
+TEXT = u'# top\na = 1\n\n[S.T]\n ; c\nb=x y\n[U]\n'
+
+
+class TestIterparse(unittest.TestCase):
+    def test_events(self):
+        self.assertEqual(list(iterparse(io.StringIO(TEXT))), [
+            ParseEvent('comment', 1, (), None, 'top'),
+            ParseEvent('option', 2, (), 'a', '1'),
+            ParseEvent('section', 4, ('S', 'T'), None, None),
+            ParseEvent('comment', 5, ('S', 'T'), None, 'c'),
+            ParseEvent('option', 6, ('S', 'T'), 'b', 'x y'),
+            ParseEvent('section', 7, ('U', ), None, None),
+        ])
+
+    def test_options(self):
+        events = list(iterparse(io.StringIO(TEXT), comments=False,
+                                subsections=False))
+        self.assertEqual([event.event for event in events],
+                         ['option', 'section', 'option', 'section'])
+        self.assertEqual(events[1].path, ('S.T', ))
+
+    def test_same_as_import(self):
+        tree = ({}, {})
+
+        for event in iterparse(io.StringIO(TEXT), comments=False):
+            node = tree
+
+            for name in event.path:
+                node = node[1].setdefault(name, ({}, {}))
+
+            if event.event == 'option':
+                node[0][event.key] = event.value
+
+        self.assertEqual(tree, ConfigFile(io.StringIO(TEXT)).get_tree(
+                                                            ordered=False))
+
+    def test_invalid_line(self):
+        events = iterparse(io.StringIO(u'a = 1\ninvalid line\nb = 2\n'))
+        self.assertEqual(next(events).key, 'a')
+
+        with self.assertRaises(ParsingError):
+            next(events)
+
+    def test_file_name(self):
+        directory = tempfile.mkdtemp()
+
+        try:
+            path = os.path.join(directory, 'test.conf')
+
+            with io.open(path, 'w') as stream:
+                stream.write(TEXT)
+
+            self.assertEqual(list(iterparse(path)),
+                             list(iterparse(io.StringIO(TEXT))))
+            # Closing the generator early closes the file too
+            events = iterparse(path)
+            next(events)
+            events.close()
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import copy
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import ConfigFile  # noqa: E402
+
+
+class TestLazy(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'test.conf')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, text):
+        with io.open(self.path, 'w', encoding='utf-8', newline='') as stream:
+            stream.write(text)
+
+    def assert_same_tree(self, **kwargs):
+        eager = ConfigFile(self.path, **kwargs)
+        lazy = ConfigFile(self.path, lazy=True, **kwargs)
+        self.assertEqual(lazy.get_tree(), eager.get_tree())
+
+    def test_line_separators(self):
+        for separator in (u'\n', u'\r\n', u'\r'):
+            self.write(separator.join((u'a = 1', u'[S]', u'b = 2', u'',
+                                       u'  [S.T]', u'# comment', u'c = 3',
+                                       u'[U]', u'd = [x]')))
+            self.assert_same_tree()
+
+    # Python 2 only supports str names, read without an encoding
+    @unittest.skipIf(str is bytes, 'Unicode names are not supported')
+    def test_unicode_whitespace(self):
+        self.write(u'a = 1\n\u3000[S]\nb = 2\n\xa0[T]\nc = 3\n')
+        self.assert_same_tree(encoding='utf-8')
+
+    def test_merged_sections(self):
+        self.write(u'[A]\na = 1\n[B]\n[a]\nA = 2\nb = 3\n[a.X]\n'
+                   u'[A.x]\nc = 4\n')
+
+        for ignore_case in (True, False):
+            self.assert_same_tree(ignore_case=ignore_case)
+
+    def test_partial_access(self):
+        self.write(u'[A]\na = 1\n[B.C]\nb = 2\n')
+        conf = ConfigFile(self.path, lazy=True)
+        self.assertEqual(conf('B', 'C')['b'], '2')
+        self.assertEqual(conf.get_tree(), ConfigFile(self.path).get_tree())
+
+    def test_export_over_source(self):
+        self.write(u'[A]\na = 1\n[B]\nb = 2\n')
+        conf = ConfigFile(self.path, lazy=True)
+        conf('A')['a'] = '3'
+        conf.export_upgrade(self.path)
+        self.assertEqual(ConfigFile(self.path).get_tree(),
+                         ({}, {'A': ({'a': '3'}, {}), 'B': ({'b': '2'}, {})}))
+
+    def test_deepcopy(self):
+        self.write(u'[A]\na = 1\n[B]\nb = 2\n')
+        conf = ConfigFile(self.path, lazy=True)
+        clone = copy.deepcopy(conf)
+        self.assertEqual(clone.get_tree(), ConfigFile(self.path).get_tree())
+        clone('A')['a'] = '3'
+        self.assertEqual(conf('A')['a'], '1')
+
+    def test_incompatible_encoding(self):
+        self.write(u'[A]\n')
+
+        with self.assertRaises(ValueError):
+            ConfigFile(self.path, lazy=True, encoding='utf-16')
+
+
+if __name__ == '__main__':
+    unittest.main()
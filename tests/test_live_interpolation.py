@@ -0,0 +1,58 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import ConfigFile  # noqa: E402
+
+
+class TestLiveInterpolation(unittest.TestCase):
+    def test_transitive_dependents_after_repeated_changes(self):
+        conf = ConfigFile({'B': 'x', 'A': '${B$}', 'C': '${A$}'},
+                          live_interpolation=True)
+        self.assertEqual(conf['C'], 'x')
+        conf['B'] = 'y'
+        self.assertEqual(conf['C'], 'y')
+        conf['B'] = 'z'
+        self.assertEqual(conf['A'], 'z')
+        self.assertEqual(conf['C'], 'z')
+
+    def test_inherited_lookup_after_repeated_changes(self):
+        conf = ConfigFile(({'x': '1'}, {'A': ({'r': '${B$:v$}'}, {}),
+                                        'B': ({'v': '${x$}'}, {})}),
+                          live_interpolation=True, inherit_options=True)
+        self.assertEqual(conf('A')['r'], '1')
+        conf['x'] = '2'
+        self.assertEqual(conf('A')['r'], '2')
+        # The new option shadows the inherited one
+        conf('B')['x'] = '3'
+        self.assertEqual(conf('A')['r'], '3')
+
+    def test_inherited_lookups_from_several_sections(self):
+        conf = ConfigFile(({}, {'A': ({'x': '1'},
+                                      {'B': ({}, {'C': ({'r': '${x$}'},
+                                                        {})}),
+                                       'D': ({'r': '${x$}'}, {})}),
+                                'E': ({'x': '2', 'r': '${x$}'}, {})}),
+                          live_interpolation=True, inherit_options=True)
+        values = (conf('A', 'B', 'C')['r'], conf('A', 'D')['r'],
+                  conf('E')['r'])
+        self.assertEqual(values, ('1', '1', '2'))
+        conf('A')['x'] = '3'
+        values = (conf('A', 'B', 'C')['r'], conf('A', 'D')['r'],
+                  conf('E')['r'])
+        self.assertEqual(values, ('3', '3', '2'))
+        conf('A', 'B')['x'] = '4'
+        self.assertEqual(conf('A', 'B', 'C')['r'], '4')
+        self.assertEqual(conf('A', 'D')['r'], '3')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import ConfigFile, ConfigOverlay  # noqa: E402
+
+
+BASE = ({'a': '1', 'b': '1'}, {'S': ({'c': '1', 'd': '1'}, {})})
+TENANT = ({'b': '2'}, {'S': ({'C': '2'}, {'T': ({'e': '2'}, {})})})
+
+
+class TestOverlay(unittest.TestCase):
+    def setUp(self):
+        self.overlay = ConfigOverlay()
+        self.overlay.push(BASE, name='base')
+        self.overlay.push(TENANT, name='tenant')
+
+    def test_precedence(self):
+        self.assertEqual(self.overlay.get((), 'a'), '1')
+        self.assertEqual(self.overlay.get((), 'b'), '2')
+        self.assertEqual(self.overlay.get(('s', ), 'c'), '2')
+        self.assertEqual(self.overlay.which(('S', ), 'd'), 'base')
+        self.assertEqual(self.overlay.which(('S', ), 'c'), 'tenant')
+        self.assertIsNone(self.overlay.get(('S', 'T'), 'a'))
+        self.assertEqual(self.overlay.get(('X', ), 'a', 'no'), 'no')
+
+    def test_remove_layer(self):
+        self.overlay.remove('tenant')
+        self.assertEqual(self.overlay.get((), 'b'), '1')
+        self.assertFalse(self.overlay.has_section(('S', 'T')))
+        self.assertEqual(self.overlay.layers(), ['base'])
+
+    def test_inherit_options(self):
+        overlay = ConfigOverlay(BASE, TENANT, inherit_options=True)
+        self.assertEqual(overlay.get(('S', 'T'), 'b'), '2')
+        self.assertEqual(overlay.get(('S', 'T'), 'd'), '1')
+
+    def test_writes_go_to_top_layer(self):
+        self.overlay.set(('S', ), 'd', '3')
+        self.overlay.set(('U', 'V'), 'f', '3')
+        self.assertEqual(self.overlay.which(('S', ), 'd'), 'tenant')
+        self.assertEqual(self.overlay.get(('U', 'V'), 'f'), '3')
+        self.overlay.remove('tenant')
+        self.assertEqual(self.overlay.get(('S', ), 'd'), '1')
+        self.assertFalse(self.overlay.has_section(('U', )))
+
+    def test_merged_tree(self):
+        merged = ConfigFile(BASE, TENANT)
+        self.assertEqual(self.overlay.get_tree(), merged.get_tree())
+        self.assertEqual(self.overlay.get_tree(('S', )),
+                         merged('S').get_tree())
+        self.assertEqual(self.overlay.materialize().get_tree(),
+                         merged.get_tree())
+
+        with self.assertRaises(KeyError):
+            self.overlay.get_tree(('X', ))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import copy
+import gc
+import os
+import pickle
+import sys
+import threading
+import unittest
+import weakref
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import ConfigFile  # noqa: E402
+
+
+class TestPathCache(unittest.TestCase):
+    def setUp(self):
+        self.conf = ConfigFile(({}, {'A': ({}, {'B': ({'x': '1'}, {})})}))
+
+    def test_hits_and_misses(self):
+        self.assertEqual(self.conf('A', 'B')['x'], '1')
+        self.assertEqual(self.conf('a', 'b')['x'], '1')
+        info = self.conf.path_cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+
+    def test_disabled(self):
+        conf = ConfigFile(path_cache_size=0)
+        self.assertIsNone(conf.path_cache_info())
+
+    def test_invalidation(self):
+        section = self.conf('A', 'B')
+        generation = self.conf.path_cache_info().generation
+        self.conf('A', 'B').delete()
+        self.assertRaises(KeyError, self.conf, 'A', 'B')
+
+        self.conf('A').make_subsection('B')
+        self.assertIsNot(self.conf('A', 'B'), section)
+        self.assertGreater(self.conf.path_cache_info().generation,
+                           generation)
+
+    def test_removed_sections_released(self):
+        ref = weakref.ref(self.conf('A', 'B'))
+        self.conf('A', 'B').delete()
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_concurrent_lookups(self):
+        conf = ConfigFile(({}, dict(('S{}'.format(num), ({}, {'T': ({}, {})}))
+                                    for num in range(50))), path_cache_size=8)
+        errors = []
+
+        def lookup():
+            try:
+                for count in range(200):
+                    for num in range(50):
+                        conf('S{}'.format(num), 'T')
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=lookup) for count in range(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+
+    def test_copy_and_pickle(self):
+        self.conf('A', 'B')
+
+        for clone in (copy.deepcopy(self.conf),
+                      pickle.loads(pickle.dumps(self.conf, 2))):
+            self.assertEqual(clone.path_cache_info().currsize, 0)
+            self.assertEqual(clone('A', 'B')['x'], '1')
+
+
+if __name__ == '__main__':
+    unittest.main()
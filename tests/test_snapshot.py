@@ -0,0 +1,35 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import ConfigFile  # noqa: E402
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.conf = ConfigFile(({'FOO': 'root'},
+                                {'S': ({'foo': 'child'}, {})}),
+                               inherit_options=True)
+
+    def test_overridden_option_spelled_differently(self):
+        snapshot = self.conf.freeze()
+
+        for opt in ('FOO', 'foo', 'Foo'):
+            self.assertEqual(snapshot.get(('S', ), opt), 'child')
+            self.assertEqual(snapshot.get((), opt), 'root')
+
+    def test_tree_without_inherited_options(self):
+        self.assertEqual(self.conf.freeze().get_tree(),
+                         self.conf.get_tree())
+
+
+if __name__ == '__main__':
+    unittest.main()
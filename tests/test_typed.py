@@ -0,0 +1,84 @@
+# This file is part of ConfigFile - Parse and edit configuration files.
+# Copyright (C) 2011-present Dario Giovannetti <dev@dariogiovannetti.net>
+# Licensed under MIT
+# https://github.com/kynikos/lib.py.configfile/blob/master/LICENSE
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from configfile import ConfigFile  # noqa: E402
+
+
+class TestTypedValues(unittest.TestCase):
+    def setUp(self):
+        self.conf = ConfigFile(({'n': '1', 'x': '1.5', 'flag': 'yes'},
+                                {'S': ({'m': '2'}, {'T': ({}, {})})}),
+                               inherit_options=True)
+
+    def test_conversions(self):
+        self.assertEqual(self.conf.get_int('n'), 1)
+        self.assertEqual(self.conf.get_float('x'), 1.5)
+        self.assertIs(self.conf.get_bool('flag'), True)
+        self.assertIs(self.conf.get_bool('flag', true=('on', ),
+                                         false=('yes', )), False)
+        self.assertIs(self.conf.get_bool('flag'), True)
+        self.assertEqual(self.conf.get_int('missing', fallback='3'), 3)
+        self.assertEqual(self.conf.get_int('missing', fallback='4'), 4)
+
+        with self.assertRaises(ValueError):
+            self.conf.get_int('x')
+
+    def test_option_change(self):
+        self.assertEqual(self.conf.get_int('n'), 1)
+        self.conf['n'] = '5'
+        self.assertEqual(self.conf.get_int('n'), 5)
+        self.assertIs(self.conf.get_bool('flag'), True)
+        self.conf['FLAG'] = 'no'
+        self.assertIs(self.conf.get_bool('flag'), False)
+
+    def test_ancestor_change(self):
+        deep = self.conf('S', 'T')
+        self.assertEqual(deep.get_int('n'), 1)
+        self.assertEqual(deep.get_int('m'), 2)
+        self.conf['n'] = '6'
+        self.conf('S')['m'] = '7'
+        self.assertEqual(deep.get_int('n'), 6)
+        self.assertEqual(deep.get_int('m'), 7)
+        deep['n'] = '8'
+        self.assertEqual(deep.get_int('n'), 8)
+        del deep['n']
+        self.assertEqual(deep.get_int('n'), 6)
+
+    def test_without_inheritance(self):
+        deep = self.conf('S', 'T')
+        self.assertEqual(deep.get_int('n', fallback='0',
+                                      inherit_options=False), 0)
+        deep['n'] = '9'
+        self.assertEqual(deep.get_int('n', inherit_options=False), 9)
+        del deep['n']
+        self.assertEqual(deep.get_int('n', fallback='0',
+                                      inherit_options=False), 0)
+
+    def test_import(self):
+        section = self.conf('S')
+        self.assertEqual(section.get_int('m'), 2)
+        self.conf.upgrade(({}, {'S': ({'m': '10'}, {})}))
+        self.assertEqual(section.get_int('m'), 10)
+        self.conf.upgrade({'n': '11'})
+        self.assertEqual(self.conf('S', 'T').get_int('n'), 11)
+        self.conf.reset({'n': '12'})
+        self.assertEqual(self.conf.get_int('n'), 12)
+
+    def test_live_interpolation(self):
+        conf = ConfigFile({'a': '1', 'b': '${a$}'}, live_interpolation=True)
+        self.assertEqual(conf.get_int('b'), 1)
+        conf['a'] = '2'
+        self.assertEqual(conf.get_int('b'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()